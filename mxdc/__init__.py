@@ -1,8 +1,11 @@
 import atexit
+import math
 import threading
 import reprlib
 import time
 import os
+import weakref
+from collections import deque
 from typing import Any, Tuple
 from gi.repository import GObject, GLib, Gio
 
@@ -14,6 +17,9 @@ from zope.interface.interface import adapter_hooks
 from mxdc.com import ca
 from mxdc.utils.log import get_module_logger, log_call
 from mxdc.utils.misc import check_call, load_binary_data
+from mxdc.utils.sigstats import SignalStats
+from mxdc.utils.timeline import StartupTimeline
+from mxdc.utils import workers
 
 logger = get_module_logger(__name__)
 
@@ -157,8 +163,19 @@ Property = GObject.Property
 
 
 class Signal(GObject.Signal):
-    def __init__(self, name: str, arg_types=Tuple[Any]):
+    """
+    Signal definition for :class:`Object` sub-classes.
+
+    :param name: signal name
+    :param arg_types: tuple of argument types
+    :param coalesce: if True, emissions from worker threads which are still pending in the main loop are merged
+        so that handlers are called only once per main-loop iteration with the newest value. Use only for
+        "latest-value-wins" signals such as position readbacks, never for discrete events.
+    """
+
+    def __init__(self, name: str, arg_types=Tuple[Any], coalesce: bool = False):
         super().__init__(name, arg_types=arg_types)
+        self.coalesce = coalesce
 
 
 class ObjectType(GObjectMeta):
@@ -169,13 +186,33 @@ class ObjectType(GObjectMeta):
 
     def __new__(cls, name, superclasses, attributes):
         signals = attributes.get('Signals', None)
+        coalesced = set()
+        for base in superclasses:
+            coalesced |= getattr(base, '__coalesced__', set())
         if signals:
             attributes.update({
                 '__sig_{}'.format(name): signal
                 for name, signal in signals.__dict__.items() if isinstance(signal, Signal)
             })
+            coalesced |= {
+                str(signal) for signal in signals.__dict__.values() if isinstance(signal, Signal) and signal.coalesce
+            }
+        attributes['__coalesced__'] = frozenset(coalesced)
         return GObjectMeta.__new__(cls, name, superclasses, attributes)
 
+    def get_signal_types(cls):
+        """
+        Get the names and parameter types of all signals supported by the class. The GObject type hierarchy is
+        introspected only once per class and the resulting table is shared by all instances.
+
+        :return: dictionary mapping signal names to parameter types
+        """
+        signal_types = cls.__dict__.get('__signal_types__')
+        if signal_types is None:
+            signal_types = _get_signal_properties(cls)
+            cls.__signal_types__ = signal_types
+        return signal_types
+
 
 class Object(GObject.GObject, metaclass=ObjectType):
     """
@@ -189,7 +226,10 @@ class Object(GObject.GObject, metaclass=ObjectType):
         class Signals:
             name = Signal('name', arg_types=(str,))
             ready = Signal('ready', arg_types=(bool, str))
+            position = Signal('position', arg_types=(float,), coalesce=True)
 
+    Signals declared with `coalesce=True` are "latest-value-wins": emissions from worker threads which have not yet
+    been dispatched in the main loop are merged into a single dispatch carrying only the newest value.
     """
 
     type_name = 'Object'
@@ -197,9 +237,12 @@ class Object(GObject.GObject, metaclass=ObjectType):
     def __init__(self):
         super().__init__()
         self.name = self.__class__.__name__
-        self.__signal_types__ = _get_signal_properties(self)
-        self.__state__ = {name: None for name in self.__signal_types__.keys()}
+        self.__state__ = dict.fromkeys(type(self).get_signal_types())
         self.__label__ = ''
+        self.__coalesce_lock = threading.Lock()
+        self.__coalesce_pending = {}
+        self.__state_changed = threading.Condition()
+        self.__state_waiters = 0
 
     def __str__(self):
         label = self.__label__ if self.__label__ else self.name
@@ -227,9 +270,35 @@ class Object(GObject.GObject, metaclass=ObjectType):
         except TypeError as e:
             logger.error("'{}': Invalid parameters for signal '{}': {}".format(self, signal, args))
 
+    def _timed_emission(self, queued, signal, *args):
+        """
+        Instrumented version of signal dispatch which records the dispatch latency and handler duration
+
+        :param queued: performance counter value at the time of emission
+        :param signal: signal name
+        :param args: signal parameters
+        """
+        start = time.perf_counter()
+        self._emission(signal, *args)
+        SignalStats.record_dispatch(self, signal, start - queued, time.perf_counter() - start)
+
+    def _coalesced_emission(self):
+        """
+        Dispatch the newest pending value of all coalesced signals in the main thread.
+        """
+        with self.__coalesce_lock:
+            pending, self.__coalesce_pending = self.__coalesce_pending, {}
+        for signal, (queued, args) in pending.items():
+            if queued is None:
+                self._emission(signal, *args)
+            else:
+                self._timed_emission(queued, signal, *args)
+        return False
+
     def emit(self, signal: str, *args, force=False):
         """
-        Emit the signal. Signal emissions are thread safe and will be handled in the main thread.
+        Emit the signal. Signal emissions are thread safe and will be handled in the main thread. Emissions
+        are instrumented when :class:`mxdc.utils.sigstats.SignalStats` is enabled.
 
         :param signal: Signal name
         :param args: list of signal parameters
@@ -254,10 +323,58 @@ class Object(GObject.GObject, metaclass=ObjectType):
         # Only emit signal if non-blank existing value is not the same as new value
         if force or ((current != value) or (current is None) or signal not in self.__state__):
             self.__state__[signal] = value
+            if self.__state_waiters:
+                self.wake_waiters()
+
+            queued = None
+            if SignalStats.enabled:
+                SignalStats.record_emit(self, signal)
+                queued = time.perf_counter()
+
             if GLib.main_context_get_thread_default():
-                self._emission(signal, *args)
-            else:
+                if queued is None:
+                    self._emission(signal, *args)
+                else:
+                    self._timed_emission(queued, signal, *args)
+            elif signal in self.__coalesced__:
+                # only one idle dispatch is scheduled for all pending coalesced signals of this object
+                with self.__coalesce_lock:
+                    schedule = not self.__coalesce_pending
+                    self.__coalesce_pending[signal] = (queued, args)
+                if schedule:
+                    GLib.idle_add(self._coalesced_emission)
+            elif queued is None:
                 GLib.idle_add(self._emission, signal, *args)
+            else:
+                GLib.idle_add(self._timed_emission, queued, signal, *args)
+
+    def wake_waiters(self):
+        """
+        Wake up all threads blocked in :func:`wait_for_state` so that their predicates are re-evaluated.
+        This is done automatically whenever a signal is emitted, but should be called explicitly when a
+        predicate depends on attributes which change without a signal emission.
+        """
+        with self.__state_changed:
+            self.__state_changed.notify_all()
+
+    def wait_for_state(self, signal: str, predicate=bool, timeout=None):
+        """
+        Block the calling thread until the state of a signal satisfies the predicate. The predicate is evaluated
+        immediately and then every time a signal is emitted by this object, without polling.
+
+        :param signal: Signal name, underscores are translated to hyphens
+        :param predicate: callable which takes the current state of the signal and returns True when the wait
+            should terminate. The default waits for a true state.
+        :param timeout: maximum time in seconds to wait, wait forever if None
+        :return: True if the predicate was satisfied, False if the wait timed-out
+        """
+        signal = signal.replace('_', '-')
+        with self.__state_changed:
+            self.__state_waiters += 1
+            try:
+                return self.__state_changed.wait_for(lambda: predicate(self.__state__.get(signal)), timeout=timeout)
+            finally:
+                self.__state_waiters -= 1
 
     def get_state(self, item: str):
         """
@@ -313,6 +430,7 @@ class Device(Object):
 
     """
     type_name = 'Device'
+    HEALTH_PROPAGATION = 2  # minimum health severity level of child devices propagated to the device
 
     class Signals:
         active = Signal("active", arg_types=(bool,))
@@ -323,11 +441,11 @@ class Device(Object):
 
     def __init__(self):
         super().__init__()
-        self.__pending = []
+        self.__pending = {}     # inactive child devices or process variables, used as an ordered set
         self.__features = set()
-        # inactive child devices or process variables
         self.health_manager = HealthManager()   # manages the health states
-        GLib.timeout_add(10000, self.check_inactive)
+        HealthSupervisor.watch(self)
+        StartupTimeline.created(self)
 
     def do_active(self, state):
         # Display message for labelled devices
@@ -409,21 +527,58 @@ class Device(Object):
             health = self.health_manager.get_health()
             if health != self.get_state('health'):
                 self.emit('health', *health)
+                HealthSupervisor.update(self, health)
+
+        if kwargs.get('active'):
+            StartupTimeline.activated(self)
 
         super().set_state(*args, **kwargs)
 
-    def add_pv(self, *args, **kwargs):
+    def add_pv(self, *args, deadband=0.0, rel_deadband=0.0, max_rate=0.0, **kwargs):
         """
         Create a new process variable (PV) and add it as a component to the device.
 
         Arguments and Keyworded arguments should be the same as those expected for instantiating the process variable
-        class.
+        class. Additionally, "changed" signals of the PV can be filtered (see :class:`mxdc.com.ca.ChangeFilter`).
+        Filtering is off by default here, high-rate readbacks of counters, motors and positioners are rate-limited
+        to :data:`mxdc.com.ca.MAX_UPDATE_RATE` by default.
+
+        :param deadband: absolute deadband for "changed" signals
+        :param rel_deadband: relative deadband for "changed" signals, as a fraction of the previous value
+        :param max_rate: maximum rate of "changed" signals per second, unlimited if zero
         """
         dev = ca.PV(*args, **kwargs)
-        self.__pending.append(dev)
+        if deadband or rel_deadband or max_rate:
+            ca.ChangeFilter(dev, deadband=deadband, rel_deadband=rel_deadband, max_rate=max_rate)
+        self.__pending[dev] = None
+        StartupTimeline.requested(self, dev)
         dev.connect('active', self.on_component_active)
         return dev
 
+    @staticmethod
+    def get_many(*pvs, timeout=5.0):
+        """
+        Read several process variables together from their monitor caches.
+
+        :param pvs: process variables to read
+        :param timeout: maximum time in seconds to wait for the values, used by the simulated backend
+        :return: list of values in the same order as the process variables
+        """
+        return ca.get_many(pvs, timeout=timeout)
+
+    @staticmethod
+    def put_many(values, wait=False, timeout=10.0):
+        """
+        Write several process variables together, waiting for all of them at once. Refused writes are logged
+        as for single writes.
+
+        :param values: dictionary mapping process variables to values, written in order
+        :param wait: if True, block until all writes have been processed
+        :param timeout: maximum time in seconds to wait for completion
+        :return: True if all writes were accepted and, when waiting, completed
+        """
+        return ca.put_many(list(values.keys()), list(values.values()), wait=wait, timeout=timeout)
+
     @staticmethod
     def poll(events=1e-5, io=1.0):
         """
@@ -437,22 +592,28 @@ class Device(Object):
 
     def add_components(self, *components):
         """
-        Add one or more components as children of this device. Components can be other devices.
+        Add one or more components as children of this device. Components can be other devices, whose health
+        is propagated to this device.
 
         :param components: components to add to this device
         """
 
         for dev in components:
             if not dev.is_active():
-                self.__pending.append(dev)
+                self.__pending[dev] = None
             dev.connect('active', self.on_component_active)
+            if isinstance(dev, Device):
+                dev.connect('health', self.on_component_health)
+                health = dev.get_state('health')
+                if health:
+                    self.on_component_health(dev, *health)
 
     def get_pending(self):
         """
         Get a list of pending/inactive components
         """
 
-        return self.__pending
+        return list(self.__pending)
 
     def on_component_active(self, component, state):
         """
@@ -463,16 +624,35 @@ class Device(Object):
         :param state: state of component, True if active, False if inactive
         """
 
-        if state and component in self.__pending:
-            self.__pending.remove(component)
-        elif not state and component not in self.__pending:
-            self.__pending.append(component)
+        if state:
+            self.__pending.pop(component, None)
+            StartupTimeline.connected(self, component)
+        else:
+            self.__pending[component] = None
         if len(self.__pending) == 0:
             self.set_state(active=True, health=(0, 'inactive', ''))
         elif self.get_state('active'):
             # only emit if current active
             self.set_state(active=False, health=(4, 'inactive', 'inactive components.'))
 
+    def on_component_health(self, component, severity, context, message):
+        """
+        Callback which is processed every time the health of a child device changes. The aggregated health of the
+        child is kept as a single context of this device, so only the changed child is updated. Only severity
+        levels of at least `HEALTH_PROPAGATION` are propagated, so that minor issues of a child do not make the
+        parent refuse commands.
+
+        :param component: child device
+        :param severity: aggregated severity of the child
+        :param context: context of the child health, unused
+        :param message: aggregated message of the child
+        """
+        severity &= ~(self.HEALTH_PROPAGATION - 1)
+        context = f'component-{id(component)}'
+        if self.health_manager.contexts.get(context, severity) != severity:
+            self.health_manager.remove(context)   # replace rather than combine the previous severity
+        self.set_state(health=(severity, context, f'{component}: {message}'))
+
     def cleanup(self):
         """
         Clean up before shutdown
@@ -483,7 +663,8 @@ class HealthManager(object):
     """
     Manages the health states. The object enables registration and removal of
     error states and consistent reporting of health based on all currently
-    active health issues.
+    active health issues. The aggregated health is updated incrementally and only
+    regenerated when the registered states actually change.
 
     :param kwargs: The keyword name is the context, and
         the value is an error string to be returned instead of the context name
@@ -493,6 +674,9 @@ class HealthManager(object):
     def __init__(self, **kwargs):
         self.messages = kwargs
         self.health_states = set()
+        self.contexts = {}      # context -> combined severity bitmask
+        self.health = (0, '', '')
+        self.changed = False
 
     def register_messages(self, **kwargs):
         """
@@ -503,6 +687,7 @@ class HealthManager(object):
         :returns:
         """
         self.messages.update(kwargs)
+        self.changed = True
 
     def add(self, severity, context, msg=None):
         """
@@ -514,9 +699,13 @@ class HealthManager(object):
             stored and used instead of the context name. Only one message per context
             type is allowed. Use a different context if you want different messages.
         """
-        if msg is not None:
-            self.messages.update({context: msg})
-        self.health_states.add((severity, context))
+        if msg is not None and self.messages.get(context) != msg:
+            self.messages[context] = msg
+            self.changed |= context in self.contexts
+        if (severity, context) not in self.health_states:
+            self.health_states.add((severity, context))
+            self.contexts[context] = self.contexts.get(context, 0) | severity
+            self.changed = True
 
     def remove(self, context):
         """
@@ -524,10 +713,10 @@ class HealthManager(object):
 
         :param context: The context name (str)
         """
-
-        err_list = [error for error in self.health_states if error[1] == context]
-        for error in err_list:
-            self.health_states.remove(error)
+        if context in self.contexts:
+            del self.contexts[context]
+            self.health_states = {error for error in self.health_states if error[1] != context}
+            self.changed = True
 
     def get_health(self):
         """
@@ -536,13 +725,88 @@ class HealthManager(object):
 
         :return: The health state tuple, (severity: int,  context: str, message: str)
         """
-        severity = 0
-        msg_list = set()
-        for sev, context in self.health_states:
-            severity = severity | sev
-            msg_list.add(self.messages.get(context, context))
-        msg = ' '.join(msg_list)
-        return severity, '', msg
+        if self.changed:
+            severity = 0
+            msg_list = {}
+            for context, sev in self.contexts.items():
+                severity |= sev
+                msg_list[self.messages.get(context, context)] = None
+            self.health = (severity, '', ' '.join(msg_list))
+            self.changed = False
+        return self.health
+
+
+class HealthSupervisor(object):
+    """
+    Supervises the health of all devices. A single main-loop timer checks for devices with inactive components
+    once they have been alive for `INACTIVE_TIMEOUT` seconds, and the current health of all unhealthy devices is
+    tracked as it changes so that it can be queried at any time without scanning all devices.
+    """
+
+    INACTIVE_TIMEOUT = 10
+    lock = threading.RLock()
+    inactive_checks = deque()
+    timer = None
+    unhealthy = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def watch(cls, device):
+        """
+        Register a device for the inactivity check
+
+        :param device: Device instance
+        """
+        with cls.lock:
+            cls.inactive_checks.append((time.monotonic() + cls.INACTIVE_TIMEOUT, weakref.ref(device)))
+            cls._schedule()
+
+    @classmethod
+    def _schedule(cls):
+        if cls.timer is None and cls.inactive_checks:
+            delay = max(0.0, cls.inactive_checks[0][0] - time.monotonic())
+            cls.timer = GLib.timeout_add(math.ceil(delay * 1000), cls._check_inactive)
+
+    @classmethod
+    def _check_inactive(cls):
+        now = time.monotonic()
+        due = []
+        with cls.lock:
+            cls.timer = None
+            while cls.inactive_checks and cls.inactive_checks[0][0] <= now:
+                due.append(cls.inactive_checks.popleft()[1])
+            cls._schedule()
+
+        for ref in due:
+            device = ref()
+            if device is not None:
+                device.check_inactive()
+        return False
+
+    @classmethod
+    def update(cls, device, health):
+        """
+        Update the health of a device
+
+        :param device: Device instance
+        :param health: health tuple (severity: int, context: str, message: str)
+        """
+        with cls.lock:
+            if health[0] > 1:
+                cls.unhealthy[device] = health
+            else:
+                cls.unhealthy.pop(device, None)
+
+    @classmethod
+    def get_unhealthy(cls, severity=2):
+        """
+        Get all devices which are currently unhealthy
+
+        :param severity: minimum severity to include
+        :return: list of (device, health) tuples in decreasing order of severity
+        """
+        with cls.lock:
+            devices = [(device, health) for device, health in cls.unhealthy.items() if health[0] >= severity]
+        return sorted(devices, key=lambda item: item[1][0], reverse=True)
 
 
 class Engine(Object):
@@ -583,10 +847,9 @@ class Engine(Object):
 
     def __engine__(self):
         """
-        Proxy for calling run method inside a thread
+        Proxy for calling run method inside a worker thread
         """
-        ca.threads_init()
-        self.run()
+        return self.run()
 
     def is_stopped(self):
         """
@@ -608,12 +871,14 @@ class Engine(Object):
 
     def start(self):
         """
-        Start the engine as a daemon thread
+        Start the engine in a dedicated thread. Engines may run indefinitely, so they do not use the shared worker
+        pool, which is reserved for short tasks.
+
+        :return: a :class:`concurrent.futures.Future` for the engine result
         """
-        worker_thread = threading.Thread(target=self.__engine__, daemon=True, name=self.__class__.__name__)
         self.paused = False
         self.stopped = False
-        worker_thread.start()
+        return workers.spawn(self.__engine__, name=self.__class__.__name__)
 
     def execute(self):
         """
@@ -1,12 +1,16 @@
 import threading
+import time
 import importlib.util
 import importlib.machinery
 import os
 from zope.interface import implementer
 
 from mxdc import Registry, Object, Signal, IBeamline
+from mxdc.com import ca
 from mxdc.utils.misc import get_project_name, import_string, DotDict
 from mxdc.utils.log import get_module_logger
+from mxdc.utils.timeline import StartupTimeline
+from mxdc.utils import workers
 
 
 @implementer(IBeamline)
@@ -27,6 +31,11 @@ class Beamline(Object):
           <config-module>_local.py for the above example.
         * Global Variables:
 
+            - CONFIG: dict, beamline configuration parameters
+            - DEVICES: dict, device names mapped to devices
+            - CONSOLE: dict, console-only devices
+            - SERVICES: dict, services
+
     Signals:
         - ready: (bool,)
 
@@ -41,6 +50,7 @@ class Beamline(Object):
 
     DEFAULTS = {}  # Default values for fields in the CONFIG dictionary
     REQUIRED = {}  # Required device names in the DEVICES or SERVICES dictionary
+    STARTUP_TIMEOUT = 30  # Maximum time in seconds to wait for all devices to become active at startup
 
     def __init__(self, console=False):
         from mxdc.conf import settings
@@ -54,9 +64,14 @@ class Beamline(Object):
 
         self.lock = threading.RLock()
         self.logger = get_module_logger(self.__class__.__name__)
+        StartupTimeline.start()
         self.load_config()
         Registry.add_utility(IBeamline, self)
 
+        # send all connection requests together and monitor the startup in the background
+        ca.flush()
+        workers.spawn(self.monitor_startup, name='Startup Monitor')
+
     def __getattr__(self, key):
         if key in self.registry:
             return self.registry[key]
@@ -134,6 +149,26 @@ class Beamline(Object):
         # finally run custom setup operations after all devices have been added to registry
         self.setup()
 
+    def monitor_startup(self):
+        """
+        Wait for all devices created at startup to become active, report the devices which are still inactive
+        after `STARTUP_TIMEOUT` seconds, and save the startup timeline to the file named by the `MXDC_TIMELINE`
+        environment variable if it is set. The recorded timeline is discarded afterwards.
+        """
+        start_time = time.time()
+        pending = StartupTimeline.wait(timeout=self.STARTUP_TIMEOUT)
+        StartupTimeline.finish()
+        if pending:
+            self.logger.warning(f'{len(pending)} devices inactive after {self.STARTUP_TIMEOUT} sec')
+            self.logger.debug(f'Inactive devices: {", ".join(str(device) for device in pending)}')
+        else:
+            self.logger.info(f'All devices active after {time.time() - start_time:0.1f} sec')
+
+        timeline_file = os.environ.get('MXDC_TIMELINE')
+        if timeline_file:
+            StartupTimeline.save(timeline_file)
+        StartupTimeline.clear()
+
     def setup(self):
         """
         Additional setup tasks should be defined here. This is run after the configuration is loaded
@@ -1,6 +1,136 @@
-import epics
-from gepics import *   # Use pyepics
-#from .oepics import *   # use built-in epics interface
+import numbers
+import os
+import threading
+import time
 
-def poll(evt=1e-5, iot=1):
-    return epics.poll(evt=evt, iot=iot)
\ No newline at end of file
+from gi.repository import GObject, GLib
+
+# Channel Access backend, 'epics' for pyepics or 'sim' for the in-process simulation
+BACKEND = os.environ.get('MXDC_CA_BACKEND', 'epics')
+MAX_UPDATE_RATE = 20.0  # default maximum rate of "changed" signals per second for high-rate readbacks
+
+if BACKEND == 'sim':
+    from .simca import *
+else:
+    import epics
+    from gepics import *   # Use pyepics
+    #from .oepics import *   # use built-in epics interface
+
+    def poll(evt=1e-5, iot=1):
+        return epics.poll(evt=evt, iot=iot)
+
+    def flush():
+        """
+        Send all pending Channel Access requests, including connection requests, to the servers
+        """
+        return epics.ca.flush_io()
+
+    def add_monitor(pv, callback):
+        """
+        Call a function for every monitored value of a process variable, directly from the Channel Access thread
+        with the timestamp of the value. Unlike "changed" signals, the calls are neither filtered (see
+        :class:`ChangeFilter`) nor delayed by the main loop.
+
+        :param pv: process variable
+        :param callback: function accepting the value and its timestamp
+        """
+        pv.raw.add_callback(lambda value=None, timestamp=None, **kwargs: callback(value, timestamp))
+
+    def get_many(pvs, timeout=5.0):
+        """
+        Read several process variables together. Process variables are always monitored, so each value is read
+        from its monitor cache through `get()`, which needs no network access once connected.
+
+        :param pvs: sequence of process variables
+        :param timeout: ignored, kept for compatibility with the simulated backend
+        :return: list of values in the same order
+        """
+        return [pv.get() for pv in pvs]
+
+    def put_many(pvs, values, wait=False, timeout=10.0):
+        """
+        Write several process variables together. Each write goes through the `put()` method of the process
+        variable, so alarm severity errors are handled and logged as for single writes, and completion of all
+        writes is awaited together.
+
+        :param pvs: sequence of process variables
+        :param values: sequence of values in the same order
+        :param wait: if True, block until all writes have been processed
+        :param timeout: maximum time in seconds to wait for completion
+        :return: True if all writes were accepted and, when waiting, completed
+        """
+        done = threading.Semaphore(0)
+        success = True
+        expected = 0
+        for pv, value in zip(pvs, values):
+            if wait:
+                result = pv.put(value, callback=lambda **kwargs: done.release())
+            else:
+                result = pv.put(value)
+            if result is None:
+                success = False     # the write was refused, see PV.put
+            elif wait:
+                expected += 1
+        epics.ca.flush_io()
+        if wait:
+            end = time.time() + timeout
+            success &= all(done.acquire(timeout=max(0.0, end - time.time())) for _ in range(expected))
+        return success
+
+
+class ChangeFilter(object):
+    """
+    Suppresses "changed" signals of a process variable which are within a deadband of the last value passed on,
+    or which arrive faster than a maximum rate. Suppressed values remain available through the `get()` method of
+    the process variable, and the latest suppressed value is passed on once the rate limit allows it.
+    The filter must be attached before any other handlers are connected to the "changed" signal.
+
+    :param pv: process variable
+    :param deadband: absolute deadband, changes smaller than or equal to this are suppressed
+    :param rel_deadband: relative deadband as a fraction of the last value passed on
+    :param max_rate: maximum rate of "changed" signals per second, unlimited if zero
+    """
+
+    def __init__(self, pv, deadband=0.0, rel_deadband=0.0, max_rate=0.0):
+        self.pv = pv
+        self.deadband = deadband
+        self.rel_deadband = rel_deadband
+        self.interval = 1.0 / max_rate if max_rate else 0.0
+        self.last_value = None
+        self.last_time = 0.0
+        self.trailing = None
+        self.pv.connect('changed', self.on_change)
+
+    def within_deadband(self, value):
+        """
+        Check if a value is within the deadband of the last value passed on
+
+        :param value: new value
+        """
+        if self.last_value is None or not isinstance(value, numbers.Number):
+            return False
+        threshold = max(self.deadband, self.rel_deadband * abs(self.last_value))
+        return threshold > 0 and abs(value - self.last_value) <= threshold
+
+    def on_change(self, pv, value):
+        now = time.monotonic()
+        if self.within_deadband(value):
+            GObject.signal_stop_emission_by_name(pv, 'changed')
+        elif now - self.last_time < self.interval:
+            GObject.signal_stop_emission_by_name(pv, 'changed')
+            if self.trailing is None:
+                delay = self.interval - (now - self.last_time)
+                self.trailing = GLib.timeout_add(int(delay * 1000) + 1, self.flush)
+        else:
+            self.last_value = value
+            self.last_time = now
+
+    def flush(self):
+        """
+        Pass on the latest value if it was suppressed by the rate limit
+        """
+        self.trailing = None
+        value = self.pv.get()
+        if value is not None and not self.within_deadband(value):
+            self.pv.emit('changed', value)
+        return False
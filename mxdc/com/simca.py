@@ -0,0 +1,458 @@
+"""
+In-process simulated Channel Access backend. Process variables are backed by an in-memory table of records
+instead of IOCs, so that real EPICS device classes can be exercised and benchmarked without a control system.
+
+The backend is selected by setting the `MXDC_CA_BACKEND` environment variable to `sim`. Records are created on
+demand with a value of zero, or can be defined and scripted beforehand through :class:`PVTable` and the helpers
+in this module, for example from a setup function named by the `MXDC_SIMCA_SETUP` environment variable
+(`package.module.function`). A simulated network latency in seconds can be set with `MXDC_SIMCA_LATENCY`, or per
+record.
+"""
+
+import os
+import threading
+import time
+from importlib import import_module
+
+import numpy
+from gi.repository import GObject, GLib
+
+__all__ = ['PV', 'poll', 'threads_init', 'flush', 'get_many', 'put_many', 'add_monitor']
+
+LATENCY = float(os.environ.get('MXDC_SIMCA_LATENCY', 0.0))
+
+
+class Record(object):
+    """
+    A simulated record holding the value of a single process variable
+
+    :param name: process variable name
+    :param value: initial value
+    :param latency: simulated network latency in seconds, defaults to the module `LATENCY`
+    """
+
+    def __init__(self, name, value=0, latency=None):
+        self.name = name
+        self.value = value
+        self.latency = latency
+        self.timestamp = time.time()
+        self.monitors = []
+        self.handlers = []
+        self.lock = threading.RLock()
+
+    def get_latency(self):
+        return LATENCY if self.latency is None else self.latency
+
+    def set(self, value):
+        """
+        Update the value from the server side and notify all monitors
+
+        :param value: new value
+        """
+        with self.lock:
+            self.value = value
+            self.timestamp = time.time()
+            monitors = list(self.monitors)
+        for pv in monitors:
+            pv.notify(value)
+
+    def put(self, value):
+        """
+        Write a value from the client side and run all scripted behaviours of the record
+
+        :param value: new value
+        """
+        self.set(value)
+        for handler in self.handlers:
+            handler(self, value)
+
+    def on_put(self, handler):
+        """
+        Add a scripted behaviour to run every time a client writes to the record
+
+        :param handler: callable which takes the record and the new value
+        """
+        self.handlers.append(handler)
+
+
+class PVTable(object):
+    """
+    The in-memory table of all simulated records
+    """
+    records = {}
+    lock = threading.Lock()
+
+    @classmethod
+    def define(cls, name, value=0, latency=None):
+        """
+        Define a record, replacing any existing value
+
+        :param name: process variable name
+        :param value: initial value
+        :param latency: simulated latency for the record
+        :return: the record
+        """
+        record = cls.get(name)
+        record.latency = latency
+        record.set(value)
+        return record
+
+    @classmethod
+    def get(cls, name):
+        """
+        Get a record by name, creating it with a value of zero if it does not exist
+
+        :param name: process variable name
+        """
+        with cls.lock:
+            record = cls.records.get(name)
+            if record is None:
+                record = cls.records[name] = Record(name)
+        return record
+
+    @classmethod
+    def value(cls, name):
+        """
+        Get the current value of a record
+
+        :param name: process variable name
+        """
+        return cls.get(name).value
+
+
+class PV(GObject.GObject):
+    """
+    Simulated process variable with the same interface and signals as the EPICS process variables.
+
+    :param name: process variable name
+    :param monitor: if True, changes are monitored and emitted through the "changed" signal
+    """
+    __gsignals__ = {
+        'changed': (GObject.SignalFlags.RUN_FIRST, None, (object,)),
+        'active': (GObject.SignalFlags.RUN_FIRST, None, (bool,)),
+        'alarm': (GObject.SignalFlags.RUN_FIRST, None, (object,)),
+    }
+
+    def __init__(self, name, monitor=True, **kwargs):
+        super().__init__()
+        self.name = name
+        self.monitor = monitor
+        self.record = PVTable.get(name)
+        self.value = None
+        self.connected = False
+        self.callbacks = []
+        self.delayed(self.record.get_latency(), self.on_connect)
+
+    @staticmethod
+    def delayed(delay, func, *args):
+        if delay > 0:
+            timer = threading.Timer(delay, func, args)
+            timer.daemon = True
+            timer.start()
+        else:
+            func(*args)
+
+    def on_connect(self):
+        with self.record.lock:
+            self.value = self.record.value
+            self.connected = True
+            self.record.monitors.append(self)
+        GLib.idle_add(self.emit, 'active', True)
+        if self.monitor:
+            GLib.idle_add(self.emit, 'changed', self.value)
+
+    def notify(self, value):
+        self.value = value
+        for callback in self.callbacks:
+            self.delayed(self.record.get_latency(), callback, value, self.record.timestamp)
+        if self.monitor:
+            self.delayed(self.record.get_latency(), GLib.idle_add, self.emit, 'changed', value)
+
+    def is_active(self):
+        return self.connected
+
+    def is_connected(self):
+        return self.connected
+
+    def get(self, *args, **kwargs):
+        """
+        Get the value of the process variable. Unmonitored process variables incur the simulated latency.
+        """
+        if not self.monitor:
+            latency = self.record.get_latency()
+            if latency:
+                time.sleep(2 * latency)
+            return self.record.value
+        return self.value
+
+    def put(self, value, wait=False, **kwargs):
+        """
+        Write a value to the process variable
+
+        :param value: new value
+        :param wait: if True, block until the write has been processed
+        """
+        latency = self.record.get_latency()
+        if wait:
+            time.sleep(2 * latency)
+            self.record.put(value)
+        else:
+            self.delayed(latency, self.record.put, value)
+
+
+def poll(evt=1e-5, iot=1):
+    time.sleep(evt)
+
+
+def threads_init():
+    pass
+
+
+def flush():
+    pass
+
+
+def add_monitor(pv, callback):
+    """
+    Call a function for every new value of a process variable with the timestamp of the value, without going
+    through the main loop.
+
+    :param pv: process variable
+    :param callback: function accepting the value and its timestamp
+    """
+    pv.callbacks.append(callback)
+
+
+def get_many(pvs, timeout=5.0):
+    """
+    Read several process variables, incurring the simulated latency only once for the group.
+
+    :param pvs: sequence of process variables
+    :param timeout: ignored
+    :return: list of values in the same order
+    """
+    unmonitored = [pv.record.get_latency() for pv in pvs if not pv.monitor]
+    if unmonitored and max(unmonitored):
+        time.sleep(2 * max(unmonitored))
+    return [pv.value if pv.monitor else pv.record.value for pv in pvs]
+
+
+def put_many(pvs, values, wait=False, timeout=10.0):
+    """
+    Write several process variables, incurring the simulated latency only once for the group.
+
+    :param pvs: sequence of process variables
+    :param values: sequence of values in the same order
+    :param wait: if True, block until all writes have been processed
+    :param timeout: ignored
+    :return: True
+    """
+    latency = max([pv.record.get_latency() for pv in pvs], default=0.0)
+    if wait:
+        time.sleep(2 * latency)
+        for pv, value in zip(pvs, values):
+            pv.record.put(value)
+    else:
+        for pv, value in zip(pvs, values):
+            pv.delayed(latency, pv.record.put, value)
+    return True
+
+
+def run_script(func, *args):
+    """
+    Run a scripted behaviour in a daemon thread
+
+    :param func: function to run
+    :param args: arguments
+    :return: the worker thread
+    """
+    worker = threading.Thread(target=func, args=args, daemon=True, name=f'SimCA: {func.__name__}')
+    worker.start()
+    return worker
+
+
+class MotorSimulation(object):
+    """
+    Scripted motor record. Writing to the target record ramps the readback record towards the target at the
+    speed given by the velocity record, toggling the moving record at the start and end of the motion. A new
+    target cancels the motion in progress, which ends before the motion to the new target starts.
+
+    :param target: name of the target record
+    :param readback: name of the readback record
+    :param moving: name of the motion status record
+    :param velocity: name of the velocity record
+    :param stop: name of the stop command record
+    :param moving_value: value of the motion status record while moving
+    :param idle_value: value of the motion status record while stopped
+    :param step_time: time between readback updates in seconds
+    """
+
+    def __init__(self, target, readback, moving, velocity, stop, moving_value=1, idle_value=0, step_time=0.02):
+        self.target = PVTable.get(target)
+        self.readback = PVTable.get(readback)
+        self.moving = PVTable.get(moving)
+        self.velocity = PVTable.get(velocity)
+        self.stop = PVTable.get(stop)
+        self.moving_value = moving_value
+        self.idle_value = idle_value
+        self.step_time = step_time
+        self.stopped = False
+        self.worker = None
+        self.lock = threading.Lock()
+        self.moving.set(idle_value)
+        self.target.on_put(self.on_target)
+        self.stop.on_put(self.on_stop)
+
+    def on_target(self, record, value):
+        with self.lock:
+            if self.worker is not None and self.worker.is_alive():
+                self.stopped = True
+                self.worker.join()
+            self.stopped = False
+            self.worker = run_script(self.ramp, value)
+
+    def on_stop(self, record, value):
+        if value:
+            self.stopped = True
+
+    def ramp(self, target):
+        start = self.readback.value
+        speed = abs(self.velocity.value) or 1.0
+        num_steps = max(1, int(abs(target - start) / (speed * self.step_time)))
+        self.moving.set(self.moving_value)
+        for position in numpy.linspace(start, target, num_steps + 1)[1:]:
+            if self.stopped:
+                break
+            time.sleep(self.step_time)
+            self.readback.set(float(position))
+        self.moving.set(self.idle_value)
+
+
+class Sequence(object):
+    """
+    Scripted state machine. Writing the trigger value to the trigger record runs a sequence of steps, each
+    setting a record to a value after a delay.
+
+    :param trigger: name of the trigger record
+    :param value: trigger value
+    :param steps: list of (name, value, delay) tuples. The value may be a callable which is evaluated when the
+        step runs, and the delay may be the name of a record holding the delay in seconds.
+    """
+
+    def __init__(self, trigger, value, steps):
+        self.value = value
+        self.steps = steps
+        PVTable.get(trigger).on_put(self.on_trigger)
+
+    def on_trigger(self, record, value):
+        if value == self.value:
+            run_script(self.run)
+
+    def run(self):
+        for name, value, delay in self.steps:
+            delay = PVTable.value(delay) if isinstance(delay, str) else delay
+            if delay:
+                time.sleep(delay)
+            PVTable.get(name).set(value() if callable(value) else value)
+
+
+def aps_motor(name, position=0.0, velocity=1.0, units='mm', precision=3):
+    """
+    Define a scripted APS motor record, as used by :class:`mxdc.devices.motor.APSMotor`
+
+    :param name: record name
+    :param position: initial position
+    :param velocity: speed in units per second
+    :param units: engineering units
+    :param precision: display precision
+    """
+    for field, value in [
+        ('VAL', position), ('RBV', position), ('VELO', velocity), ('ACCL', 0.1), ('PREC', precision),
+        ('EGU', units), ('DESC', name), ('SET', 0), ('STAT', 0), ('STOP', 0)
+    ]:
+        PVTable.define(f'{name}.{field}', value)
+    return MotorSimulation(
+        f'{name}.VAL', f'{name}.RBV', f'{name}.DMOV', f'{name}.VELO', f'{name}.STOP', moving_value=0, idle_value=1
+    )
+
+
+def vme_motor(name, position=0.0, velocity=1.0, precision=3, encoded=False):
+    """
+    Define a scripted CLS VME motor record, as used by :class:`mxdc.devices.motor.VMEMotor`
+
+    :param name: record name including units, e.g. 'SMTR1608-5-B10-12:mm'
+    :param position: initial position
+    :param velocity: speed in units per second
+    :param precision: display precision
+    :param encoded: whether the motor uses an encoder readback
+    """
+    root, units = name.rsplit(':', 1)
+    readback = f'{name}:fbk' if encoded else f'{name}:sp'
+    for record, value in [
+        (name, position), (readback, position), (f'{readback}.PREC', precision), (f'{root}:desc', root),
+        (f'{root}:calibDone', 1), (f'{root}:velo:{units}ps', velocity), (f'{root}:vel:{units}ps:sp', velocity),
+    ]:
+        PVTable.define(record, value)
+    return MotorSimulation(name, readback, f'{root}:status', f'{root}:vel:{units}ps:sp', f'{root}:stop')
+
+
+def area_detector(name, state_acquiring=1, state_idle=0):
+    """
+    Define a scripted areaDetector state machine, as used by :class:`mxdc.devices.detector.PilatusDetector`.
+    Writing 1 to the Acquire record arms the detector, acquires for NumImages x AcquirePeriod seconds and
+    then returns to idle.
+
+    :param name: detector record prefix
+    :param state_acquiring: detector state value while acquiring
+    :param state_idle: detector state value when idle
+    """
+    for record, value in [
+        ('AcquireTime', 0.1), ('AcquirePeriod', 0.1), ('NumImages', 1), ('Armed', 0),
+        ('DetectorState_RBV', state_idle), ('ArrayCounter_RBV', 0), ('AsynIO.CNCT', 1),
+        ('FileTemplate', '%s%s_%05d.cbf'),
+    ]:
+        PVTable.define(f'{name}:{record}', value)
+    PVTable.define(f'{name}:Duration', 0.1)
+    PVTable.get(f'{name}:AcquirePeriod').on_put(
+        lambda record, value: PVTable.get(f'{name}:Duration').set(value * PVTable.value(f'{name}:NumImages'))
+    )
+    PVTable.get(f'{name}:NumImages').on_put(
+        lambda record, value: PVTable.get(f'{name}:Duration').set(value * PVTable.value(f'{name}:AcquirePeriod'))
+    )
+    return Sequence(f'{name}:Acquire', 1, [
+        (f'{name}:Armed', 1, 0.0),
+        (f'{name}:DetectorState_RBV', state_acquiring, 0.0),
+        (f'{name}:ArrayCounter_RBV', lambda: PVTable.value(f'{name}:ArrayCounter_RBV') + 1, f'{name}:Duration'),
+        (f'{name}:DetectorState_RBV', state_idle, 0.0),
+        (f'{name}:Armed', 0, 0.0),
+        (f'{name}:Acquire', 0, 0.0),
+    ])
+
+
+def mca_record(root, channels=4096, counts=1000):
+    """
+    Define a scripted mcaRecord, as used by :class:`mxdc.devices.mca.XFlashMCA`. Starting an acquisition sets
+    the acquiring flag, waits for the preset time, fills the spectrum with simulated counts and then clears the
+    acquiring flag.
+
+    :param root: record prefix
+    :param channels: number of channels
+    :param counts: mean counts per channel
+    """
+    for record, value in [
+        ('mca1.PRTM', 1.0), ('mca1.ACQG', 0), ('mca1.CALS', 0.005), ('mca1.CALO', 0.0),
+        ('mca1', numpy.zeros(channels)), ('Rontec1Temperature', -20.0),
+    ]:
+        PVTable.define(f'{root}:{record}', value)
+    return Sequence(f'{root}:mca1.ERST', 1, [
+        (f'{root}:mca1.ACQG', 1, 0.0),
+        (f'{root}:mca1', lambda: numpy.random.poisson(counts, channels), f'{root}:mca1.PRTM'),
+        (f'{root}:mca1.ACQG', 0, 0.0),
+    ])
+
+
+# run configured setup function
+_setup_name = os.environ.get('MXDC_SIMCA_SETUP')
+if _setup_name:
+    _module_name, _func_name = _setup_name.rsplit('.', 1)
+    getattr(import_module(_module_name), _func_name)()
@@ -83,6 +83,7 @@ class Application(Gtk.Application):
         from mxdc.engines.scanning import AbsScan, AbsScan2, RelScan, RelScan2, GridScan, SlewScan, SlewGridScan
         from mxdc.utils import fitting
         from mxdc.utils.recorder import DataSaver
+        from mxdc.utils.sigstats import SignalStats
         from mxdc.com.ca import PV
 
         self.shell_config.InteractiveShellEmbed.colors = 'Neutral'
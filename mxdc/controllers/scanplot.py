@@ -122,6 +122,7 @@ class ScanPlotter(object):
         self.scan_callbacks = {
             'started': self.on_start,
             'new-point': self.on_new_point,
+            'new-points': self.on_new_points,
             'progress': self.on_progress,
             'done': self.on_done,
             'error': self.on_error,
@@ -168,6 +169,9 @@ class ScanPlotter(object):
     def on_new_point(self, scan, data):
         self.plotter.add_point(data)
 
+    def on_new_points(self, scan, data):
+        self.plotter.add_points(data)
+
     def on_new_row(self, scan, index):
         self.plotter.new_row(index)
 
@@ -1,4 +1,3 @@
-import time
 
 from enum import IntEnum
 from zope.interface import implementer
@@ -169,18 +168,11 @@ class AutoMounter(Device):
         states_text = "|".join((str(s) for s in states))
 
         logger.debug('"{}" Waiting for {}'.format(self.name, states_text))
-        elapse = time.time() + timeout
-
-        while time.time() <= elapse:
-            time.sleep(0.1)
-            status = self.get_state('status')
-            if status in states:
-                break
-        else:
+        if not self.wait_for_state('status', lambda status: status in states, timeout=timeout):
             logger.warning(f'"{self.name}" timed-out waiting for "{states_text}"')
             return False
 
-        logger.debug(f'"{self.name}": {status} attained ')
+        logger.debug(f'"{self.name}": {self.get_state("status")} attained ')
         return True
 
     def wait_while(self, *states, timeout=20.0):
@@ -197,13 +189,7 @@ class AutoMounter(Device):
         states_text = "|".join([str(state) for state in states])
 
         logger.debug('"{}" Waiting while {}'.format(self.name, states_text))
-        elapse = time.time() + timeout
-        while time.time() <= elapse:
-            time.sleep(0.05)
-            status = self.get_state('status')
-            if status not in states:
-                break
-        else:
+        if not self.wait_for_state('status', lambda status: status not in states, timeout=timeout):
             logger.warning(f'"{self.name}" timed-out waiting in "{states_text}"')
             return False
 
@@ -133,22 +133,25 @@ class ExtCenter(BaseCenter):
         Registry.add_utility(ICenter, self)
 
     def on_pos_changed(self, *args, **kwargs):
-        if self.score.get() > self.threshold and self.w.get() > MIN_WIDTH:
-            cx = self.x.get() + self.w.get() / 2
-            cy = self.y.get() + self.h.get() / 2
-            loop = CenterObject(cx, cy, self.score.get(), self.w.get(), self.h.get(), label=self.label.get())
+        score, x, y, w, h, label = self.get_many(self.score, self.x, self.y, self.w, self.h, self.label)
+        if score > self.threshold and w > MIN_WIDTH:
+            cx = x + w / 2
+            cy = y + h / 2
+            loop = CenterObject(cx, cy, score, w, h, label=label)
             self.update_found(loop)
             self.set_state(loop=loop)
         else:
             self.set_state(loop=None)
 
     def on_obj_changed(self, *args, **kwargs):
-        num_obj = self.size.get()
-        if num_obj > 0:
-            xs = self.obj_x.get()[:num_obj]
-            ys = self.obj_y.get()[:num_obj]
-            scores = self.obj_scores.get()[:num_obj]
-            types = self.obj_types.get()[:num_obj]
+        num_obj, xs, ys, scores, types = self.get_many(
+            self.size, self.obj_x, self.obj_y, self.obj_scores, self.obj_types
+        )
+        if num_obj and num_obj > 0:
+            xs = xs[:num_obj]
+            ys = ys[:num_obj]
+            scores = scores[:num_obj]
+            types = types[:num_obj]
             crystals = types == self.ObjectType.CRYSTAL
             pins = types == self.ObjectType.PIN
             objects = []
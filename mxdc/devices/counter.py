@@ -6,13 +6,16 @@ import numpy
 from zope.interface import implementer
 
 from mxdc import Signal, Device
-from mxdc.utils import decorators
+from mxdc.com import ca
+from mxdc.utils import decorators, misc
 from mxdc.utils.log import get_module_logger
 from .interfaces import ICounter
 
 # setup module logger with a default do-nothing handler
 logger = get_module_logger(__name__)
 
+COUNT_INTERVAL = 0.01   # integrated counts are expressed as sums over intervals of this duration in seconds
+
 
 @implementer(ICounter)
 class BaseCounter(Device):
@@ -27,9 +30,22 @@ class BaseCounter(Device):
     """
 
     class Signals:
-        changed = Signal("changed", arg_types=(object,))
+        changed = Signal("changed", arg_types=(object,), coalesce=True)
         count = Signal("count", arg_types=(float,))
 
+    # True if the counter can integrate over an externally timed window, see :func:`get_count`
+    gated = False
+
+    def get_count(self, start, end):
+        """
+        Integrate the value over a time window which has already elapsed. Only available for gated counters.
+
+        :param start: start time of the window, see :func:`mxdc.utils.misc.HistoryBuffer.now`
+        :param end: end time of the window
+        :return: accumulated value
+        """
+        raise NotImplementedError('Subclasses must implement this method')
+
     def count(self, duration):
         """
         Integrate of the value for the specified amount of time. Blocks while counting
@@ -72,57 +88,103 @@ class BaseCounter(Device):
 class Counter(BaseCounter):
     """
     EPICS based Counter Device objects. Enables counting and averaging of
-    process variables over given time periods.
+    process variables over given time periods. Every value from the process variable monitor is kept in a
+    buffer with its local time of arrival, before any deadband or rate filtering of "changed" signals, and
+    integrated exactly over the requested time window, treating each value as held until the next update.
+    Arrival times are used rather than Channel Access timestamps so that buffered values and time windows share
+    the same clock regardless of the clock or timestamp handling of the IOC.
 
     :param pv_name: process variable name
     :param offset:   zero offset value.
+    :param deadband: deadband for value changes, see :func:`mxdc.Device.add_pv`
+    :param max_rate: maximum rate of value changes per second, see :func:`mxdc.Device.add_pv`. Counting is not
+        affected since it uses the buffered values.
+    :param buffer_size: maximum number of monitored values to keep
     """
+    gated = True
 
-    def __init__(self, pv_name, offset=0.0, scale=1.0):
+    def __init__(self, pv_name, offset=0.0, scale=1.0, deadband=0.0, max_rate=ca.MAX_UPDATE_RATE, buffer_size=16384):
         super().__init__()
         self.name = pv_name
         self.offset = float(offset)
         self.scale = float(scale)
         self.stopped = True
+        self.history = misc.HistoryBuffer(buffer_size)
 
-        self.value = self.add_pv(pv_name)
+        self.value = self.add_pv(pv_name, deadband=deadband, max_rate=max_rate)
         self.descr = self.add_pv('%s.DESC' % pv_name)
 
         self.value.connect('changed', self.on_value)
         self.descr.connect('changed', self.on_description)
+        ca.add_monitor(self.value, self.on_monitor)
     
     def on_description(self, pv, val):
         if val != '':
             self.name = val
 
+    def on_monitor(self, val, timestamp):
+        # every value is buffered on arrival, before any filtering or main loop delays. The Channel Access
+        # timestamp is not used since the IOC clock may be skewed, and soft records may have stale timestamps
+        if val is not None:
+            self.history.add(val * self.scale - self.offset)
+
+    def get_value(self):
+        """
+        Get the current scaled value, or nan if the value can not be read
+        """
+        val = self.value.get()
+        return numpy.nan if val is None else val * self.scale - self.offset
+
     def on_value(self, pv, val):
         value = (val*self.scale - self.offset)
         if not self.stopped:
             self.set_state(changed=value, count=value)
         else:
             self.set_state(changed=value)
-    
+
+    def integrate(self, start, end):
+        """
+        Integrate the buffered values over a time window
+
+        :param start: start time of the window
+        :param end: end time of the window
+        :return: integral of the value over the window in value-seconds
+        """
+        data = self.history.get_data()
+        times, values = data[:, 0], data[:, 1]
+        first = max(numpy.searchsorted(times, start, side='right') - 1, 0)
+        last = numpy.searchsorted(times, end, side='left')
+        if last <= first:
+            # no updates within the window, the latest value was held throughout
+            value = values[last - 1] if last > 0 else self.get_value()
+            return value * (end - start)
+
+        edges = numpy.clip(times[first:last], start, end)
+        edges[0] = start
+        widths = numpy.diff(numpy.append(edges, end))
+        return float(numpy.dot(values[first:last], widths))
+
+    def get_count(self, start, end):
+        total = self.integrate(start, end) / COUNT_INTERVAL
+        self.set_state(count=total)
+        return total
+
     def count(self, duration):
-        average = self.average(duration)
-        interval=0.01
-        total = (duration / interval) * average
+        start = misc.HistoryBuffer.now()
+        time.sleep(max(duration, 0.0))
+        total = self.get_count(start, misc.HistoryBuffer.now())
         logger.debug('(%s) Returning integrated values for %0.2f sec.' % (self.name, duration))
-        self.set_state(count=total)
         return total
 
     def average(self, duration):
         if duration <= 0.0:
-            return self.value.get() * self.scale - self.offset
+            return self.get_value()
 
         logger.debug('Averaging detector (%s) for %0.2f sec.' % (self.name, duration))
-        interval=0.01
-        values = []
-        time_left = duration
-        while time_left > 0.0:
-            values.append( self.value.get() )
-            time.sleep(interval)
-            time_left -= interval
-        return sum(values, 0.0) / len(values) - self.offset
+        start = misc.HistoryBuffer.now()
+        time.sleep(duration)
+        end = misc.HistoryBuffer.now()
+        return self.integrate(start, end) / (end - start)
 
     def start(self):
         self.stopped = False
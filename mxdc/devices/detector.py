@@ -161,13 +161,10 @@ class BaseDetector(Device):
         states_text = "|".join((str(s) for s in states))
 
         logger.debug('"{}" Waiting for {}'.format(self.name, states_text))
-        elapsed = 0
+        start_time = time.time()
 
-        while elapsed <= timeout and self.get_state("state") not in states:
-            elapsed += 0.05
-            time.sleep(0.05)
-
-        if elapsed <= timeout:
+        if self.wait_for_state("state", lambda state: state in states, timeout=timeout):
+            elapsed = time.time() - start_time
             logger.debug('"{}": {} attained after {:0.2f}s'.format(self.name, self.get_state("state"), elapsed))
             return True
         else:
@@ -188,13 +185,10 @@ class BaseDetector(Device):
         states_text = "|".join([str(state) for state in states])
 
         logger.debug('"{}" Waiting for {}'.format(self.name, states_text))
-        elapsed = 0
-
-        while elapsed <= timeout and self.get_state("state") in states:
-            elapsed += 0.05
-            time.sleep(0.05)
+        start_time = time.time()
 
-        if elapsed <= timeout:
+        if self.wait_for_state("state", lambda state: state not in states, timeout=timeout):
+            elapsed = time.time() - start_time
             logger.debug('"{}": {} attained after {:0.2f}s'.format(self.name, self.get_state("state"), elapsed))
             return True
         else:
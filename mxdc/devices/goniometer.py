@@ -76,16 +76,11 @@ class BaseGoniometer(Device):
         :return: bool, False if timeout
         """
 
-        end_time = time.time() + timeout
-        success = False
         self.stopped = False
         logger.debug(f'{self.name}: Waiting to start ...')
-        while time.time() < end_time:
-            if self.stopped or self.is_busy():
-                logger.debug(f'{self.name}: started ...')
-                success = True
-                break
-            time.sleep(0.01)
+        success = self.wait_for_state('busy', lambda busy: busy or self.stopped, timeout=timeout)
+        if success:
+            logger.debug(f'{self.name}: started ...')
         else:
             logger.warn(f'{self.name}: Timed-out waiting to stop after {timeout} sec')
         return success
@@ -96,25 +91,13 @@ class BaseGoniometer(Device):
         :param timeout: maximum time in seconds to wait before failing.
         :return: bool, False if timeout
         """
-        success = False
         self.stopped = False
         logger.debug(f'{self.name}: Waiting to stop ...')
-        if timeout is None:
-            while self.is_busy() and not self.stopped:
-                time.sleep(0.01)
-            else:
-                logger.debug(f'{self.name}: stopped ...')
-                success = True
+        success = self.wait_for_state('busy', lambda busy: not busy or self.stopped, timeout=timeout)
+        if success:
+            logger.debug(f'{self.name}: stopped ...')
         else:
-            end_time = time.time() + timeout
-            while time.time() < end_time:
-                if self.stopped or not self.is_busy():
-                    logger.debug(f'{self.name}: stopped ...')
-                    success = True
-                    break
-                time.sleep(0.01)
-            else:
-                logger.warn(f'{self.name}: Timed-out waiting to stop after {timeout} sec')
+            logger.warn(f'{self.name}: Timed-out waiting to stop after {timeout} sec')
         return success
 
     def wait(self, start=True, stop=True, timeout=None):
@@ -143,6 +126,7 @@ class BaseGoniometer(Device):
         Stop and abort the current scan if any.
         """
         self.stopped = True
+        self.wake_waiters()
 
     def scan(self, **kwargs):
         """
@@ -227,6 +211,7 @@ class ParkerGonio(BaseGoniometer):
     def stop(self):
         logger.debug('Stopping goniometer ...')
         self.stopped = True
+        self.wake_waiters()
         self.stop_cmd.put(1)
 
 
@@ -519,6 +504,7 @@ class MD2Gonio(BaseGoniometer):
         Stop and abort the current scan if any.
         """
         self.stopped = True
+        self.wake_waiters()
         self.abort_cmd.put(self.NULL_VALUE)
 
 
@@ -630,6 +616,7 @@ class SimGonio(BaseGoniometer):
 
     def stop(self):
         self.stopped = True
+        self.wake_waiters()
         self._scanning = False
         self.omega.stop()
 
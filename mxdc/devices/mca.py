@@ -4,13 +4,13 @@ import os
 import random
 import time
 
-import epics
 import numpy
 from enum import IntFlag, auto
 
 from scipy import interpolate
 from gi.repository import GLib
 from mxdc import Signal, Device, APP_DIR
+from mxdc.com import ca
 from mxdc.utils import fitting
 from mxdc.utils.log import get_module_logger
 from zope.interface import implementer
@@ -46,23 +46,23 @@ class BaseMCA(Device):
     """
 
     class Signals:
-        dead_time = Signal("dead-time", arg_types=(float,))
+        dead_time = Signal("dead-time", arg_types=(float,), coalesce=True)
         counts = Signal("counts", arg_types=(int, int))         # element index, sum of values in ROI
         spectra = Signal("spectra", arg_types=(int, object))    # element index, full spectrum
-        progress = Signal("progress", arg_types=(float,))
-
-    start_cmd: epics.PV
-    stop_cmd: epics.PV
-    mode_cmd: epics.PV
-    temperature: epics.PV
-    acquiring: epics.PV
-    progress: epics.PV
-    slope: epics.PV
-    offset: epics.PV
-    count_time: epics.PV
-    input_counts: epics.PV | List[epics.PV]
-    output_counts: epics.PV | List[epics.PV]
-    mca_data: List[epics.PV]
+        progress = Signal("progress", arg_types=(float,), coalesce=True)
+
+    start_cmd: ca.PV
+    stop_cmd: ca.PV
+    mode_cmd: ca.PV
+    temperature: ca.PV
+    acquiring: ca.PV
+    progress: ca.PV
+    slope: ca.PV
+    offset: ca.PV
+    count_time: ca.PV
+    input_counts: ca.PV | List[ca.PV]
+    output_counts: ca.PV | List[ca.PV]
+    mca_data: List[ca.PV]
     spectra: NDArray
 
     def __init__(self, *args, **kwargs):
@@ -258,8 +258,8 @@ class BaseMCA(Device):
         self.wait()
         GLib.source_remove(src_id)
 
-        for i, spec in enumerate(self.mca_data):
-            self.data[:, i] = spec.get()
+        for i, spec in enumerate(self.get_many(*self.mca_data)):
+            self.data[:, i] = spec
 
         corrected = self.data - self.dark
         self.spectra[:, 0] = self.channel_to_energy(numpy.arange(0, self.channels, 1))
@@ -270,22 +270,16 @@ class BaseMCA(Device):
         self.acquire_data(t)
         return self.data
 
-    def wait_start(self, poll=0.001, timeout=2):
+    def wait_start(self, timeout=2):
         logger.debug('Waiting for MCA to start acquiring.')
-        while self.acquiring.get() == 0 and timeout > 0:
-            timeout -= poll
-            time.sleep(poll)
-        if timeout <= 0:
+        if not self.wait_for_state('busy', timeout=timeout):
             logger.warning('Timed out waiting for MCA to start acquiring')
             return False
         return True
 
-    def wait_stop(self, poll=0.001, timeout=30):
+    def wait_stop(self, timeout=30):
         logger.debug('Waiting for MCA to finish acquiring.')
-        while self.acquiring.get() == 1 and timeout > 0:
-            timeout -= poll
-            time.sleep(poll)
-        if timeout <= 0:
+        if not self.wait_for_state('busy', lambda busy: not busy, timeout=timeout):
             logger.warning('Timed out waiting for MCA finish acquiring')
             return False
         return True
@@ -328,7 +322,7 @@ class XFlashMCA(BaseMCA):
     :param root: (str), Root PV name of the mcaRecord.
     :param channels: (int), Number of channels.
     """
-    count_time_fbk: epics.PV
+    count_time_fbk: ca.PV
 
     def __init__(self, root, channels=4096, descr='XFlash MCA'):
         super().__init__(root, elements=1, channels=channels)
@@ -341,6 +335,7 @@ class XFlashMCA(BaseMCA):
         self.mca_data = [self.add_pv(f"{root}:mca{d + 1:d}") for d in range(self.elements)]
 
         self.acquiring = self.add_pv(f"{root}:mca1.ACQG")
+        self.acquiring.connect('changed', self.on_state_changed)
         self.acquiring.connect('changed', self.schedule_warmup) # schedule a warmup at the end of every acquisition
 
         self.count_time = self.add_pv(f"{root}:mca1.PRTM")
@@ -417,6 +412,7 @@ class QuantaxMCA(XFlashMCA):
         self.count_time = self.add_pv(f"{root}:SET:realtime")
 
         # schedule a warmup at the end of every acquisition
+        self.acquiring.connect('changed', self.on_state_changed)
         self.acquiring.connect('changed', self.schedule_warmup)
         self.progress.connect('changed', self.on_progress)
 
@@ -435,7 +431,7 @@ class VortexMCA(BaseMCA):
     """
     EPICS based 4-element Vortex ME4 detector object.
     """
-    count_time_fbk: epics.PV
+    count_time_fbk: ca.PV
 
     def __init__(self, name, channels=2048):
         BaseMCA.__init__(self, name, elements=4, channels=channels)
@@ -6,7 +6,7 @@ from gi.repository import GLib
 from zope.interface import implementer
 
 from mxdc import Registry, Signal, Device
-from mxdc.com.ca import PV
+from mxdc.com.ca import PV, MAX_UPDATE_RATE
 from mxdc.devices.interfaces import IPositioner, IOnOff, IMotor
 from mxdc.devices.motor import BaseMotor
 from mxdc.utils import converter
@@ -26,7 +26,7 @@ class BasePositioner(Device):
     """
 
     class Signals:
-        changed = Signal("changed", arg_types=(object,))
+        changed = Signal("changed", arg_types=(object,), coalesce=True)
 
     def __init__(self):
         super().__init__()
@@ -132,16 +132,19 @@ class Positioner(BasePositioner):
           provided, the same PV will be used to both set and get.
         - `scale` (float): A percentage to scale the set and get values by.
         - `units` (str): The units of the value.
+        - `deadband` (float): deadband for feedback changes, see :func:`mxdc.Device.add_pv`
+        - `max_rate` (float): maximum rate of feedback changes per second, see :func:`mxdc.Device.add_pv`
     """
 
-    def __init__(self, name, fbk_name=None, scale=100, units="", wait_time=0):
+    def __init__(self, name, fbk_name=None, scale=100, units="", wait_time=0, deadband=0.0, max_rate=MAX_UPDATE_RATE):
         super().__init__()
-        self.set_pv = self.add_pv(name)
         self.scale = scale
         if fbk_name is None:
+            self.set_pv = self.add_pv(name, deadband=deadband, max_rate=max_rate)
             self.fbk_pv = self.set_pv
         else:
-            self.fbk_pv = self.add_pv(fbk_name)
+            self.set_pv = self.add_pv(name)
+            self.fbk_pv = self.add_pv(fbk_name, deadband=deadband, max_rate=max_rate)
         self.DESC = PV('%s.DESC' % name)  # devices should work without desc pv so not using add_pv
         self.name = name
         self.units = units
@@ -460,16 +463,10 @@ class Attenuator(BasePositioner):
         self._energy.connect('changed', self.signal_change)
 
     def get(self):
-        if self._energy.is_connected():
-            e = self._energy.get()
-        else:
+        if not (self._energy.is_connected() and all(f.is_connected() for f in self._filters)):
             return 999.0
-        bitmap = ''
-        for f in self._filters:
-            if f.is_connected():
-                bitmap += '%d' % f.get()
-            else:
-                return 999.0
+        e, *bits = self.get_many(self._energy, *self._filters)
+        bitmap = ''.join('%d' % bit for bit in bits)
         thickness = int(bitmap, 2) / 10.0
         if e < .1:
             e = 0.1
@@ -485,8 +482,7 @@ class Attenuator(BasePositioner):
         return attenuation * 100.0
 
     def _set_bits(self, bitmap):
-        for i in range(4):
-            self._filters[i].put(int(bitmap[i]))
+        self.put_many({f: int(bit) for f, bit in zip(self._filters, bitmap)})
 
     def set(self, target, wait=False):
         e = self._energy.get()
@@ -556,14 +552,17 @@ class Attenuator2(Attenuator):
         self._energy.connect('changed', self.signal_change)
 
     def _set_bits(self, bitmap):
-        for i in range(4):
-            val = int(bitmap[i])
-            if self._filters[i].get() == val:
+        current = self.get_many(*self._filters)
+        commands = {}
+        for i, bit in enumerate(bitmap):
+            val = int(bit)
+            if current[i] == val:
                 continue
             if val == 1:
-                self._close[i].put(1)
+                commands[self._close[i]] = 1
             else:
-                self._open[i].put(1)
+                commands[self._open[i]] = 1
+        self.put_many(commands)
 
 
 @implementer(IOnOff)
@@ -1,11 +1,13 @@
 import time
+from concurrent import futures
 from threading import Lock
 
 import numpy
 from zope.interface import implementer
 
 from mxdc import Signal, Device
-from mxdc.utils import converter
+from mxdc.com import ca
+from mxdc.utils import converter, misc, workers
 from mxdc.utils.decorators import async_call
 from mxdc.utils.log import get_module_logger
 from .interfaces import IMotor
@@ -37,11 +39,13 @@ class BaseMotor(Device):
 
     # Motor signals
     class Signals:
-        changed = Signal("changed", arg_types=(float,))
+        changed = Signal("changed", arg_types=(float,), coalesce=True)
         starting = Signal("starting", arg_types=(bool,))
         target = Signal("target", arg_types=(object, float))
         done = Signal("done", arg_types=())
 
+    monitored_history = False   # position history recorded from the readback monitor instead of "changed" signals
+
     def __init__(self, name, *args, precision=2, units='', label=''):
         super().__init__()
         self.name = name
@@ -58,6 +62,8 @@ class BaseMotor(Device):
         self.moving_value = 1
         self.disabled_value = 0
         self.calibrated_value = 1
+        self.history = None
+        self.history_users = 0
         self.setup()
 
     def setup(self):
@@ -65,6 +71,49 @@ class BaseMotor(Device):
         Prepare all the components of the motor when it is started.
         """
 
+    def emit(self, signal, *args, **kwargs):
+        if signal == 'changed' and self.history is not None and args[0] is not None and not self.monitored_history:
+            self.history.add(args[0])
+        super().emit(signal, *args, **kwargs)
+
+    def enable_history(self, size=4096):
+        """
+        Start recording a history of timestamped positions of the motor. A larger history replaces a smaller one
+        already being recorded. Each call must be balanced by a call to :func:`disable_history`.
+
+        :param size: maximum number of positions to keep
+        :return: the position history, a :class:`mxdc.utils.misc.HistoryBuffer` instance
+        """
+        self.history_users += 1
+        if self.history is None or self.history.size < size:
+            self.history = misc.HistoryBuffer(size)
+            position = self.get_state('changed')
+            if position is not None:
+                self.history.add(position)
+        return self.history
+
+    def disable_history(self):
+        """
+        Release the position history. Recording stops and the history is discarded once all users which enabled
+        it have released it.
+        """
+        self.history_users = max(0, self.history_users - 1)
+        if self.history_users == 0:
+            self.history = None
+
+    def position_at(self, times, left=None, right=None):
+        """
+        Get the positions of the motor at the given times from the position history. See :func:`enable_history`.
+
+        :param times: a time or an array of times
+        :param left: value for times before the recorded history, defaults to the earliest position
+        :param right: value for times after the recorded history, defaults to the latest position
+        :return: position or array of positions
+        """
+        if self.history is None:
+            raise MotorError(f'Position history is not enabled for {self}')
+        return self.history.value_at(times, left=left, right=right)
+
     def is_starting(self):
         """
         Check if motor is starting, ie a command has been received but has not yet started moving.
@@ -241,15 +290,16 @@ class BaseMotor(Device):
         """
         if self.is_starting() and not self.is_busy():
             logger.debug(f'Waiting to start: {self}')
-            max_time = time.time() + timeout
-            while self.is_starting() and not self.is_busy() and time.time() < max_time:
-                self.poll()
-                if self.has_reached(self.target_position):
-                    logger.debug(f"'{self}': {self.get_position():12.4g} {self.units}")
-                    break
-            if time.time() >= max_time:
+            success = self.wait_for_state(
+                'busy',
+                lambda busy: busy or not self.is_starting() or self.has_reached(self.target_position),
+                timeout=timeout
+            )
+            if not success:
                 logger.warning(f'Timed-out after {timeout:4g} sec: {self}')
                 return False
+            elif not self.is_busy():
+                logger.debug(f"'{self}': {self.get_position():12.4g} {self.units}")
         return True
 
     def wait_stop(self, target=None, timeout=60*5):
@@ -261,22 +311,19 @@ class BaseMotor(Device):
         :param poll: Time step between checking motor state
         :return: (boolean), True if motor stopped successfully or if it is not moving.
         """
-        elapsed = 0
-        max_time = time.time() + timeout
         if target is not None:
             logger.debug(f'{self} Waiting to reach target: {target:12.4g} {self.units}')
-            while (self.is_busy() or not self.has_reached(target)) and time.time() < max_time:
-                self.poll()
-            if time.time() >= max_time:
+            success = self.wait_for_state(
+                'busy', lambda busy: not busy and self.has_reached(target), timeout=timeout
+            )
+            if not success:
                 logger.warning(
                     f'"{self}" Timed-out. Did not reach {self.target_position:g} after {timeout:g} sec.'
                 )
                 return False
         else:
             logger.debug(f'Waiting to stop: {self}')
-            while self.is_busy() and time.time() < max_time:
-                self.poll()
-            if time.time() >= max_time:
+            if not self.wait_for_state('busy', lambda busy: not busy, timeout=timeout):
                 logger.warning(
                     f'"{self}" Timed-out. Did not stop moving after {timeout:g} sec.'
                 )
@@ -373,15 +420,29 @@ class SimMotor(BaseMotor):
 class Motor(BaseMotor):
     """
     Base Motor object for EPICS based motor records.
+
+    :param name: root PV name of motor
+    :param deadband: deadband for position readback changes, see :func:`mxdc.Device.add_pv`
+    :param max_rate: maximum rate of position readback changes per second, see :func:`mxdc.Device.add_pv`. The
+        position history is recorded from every monitored readback value and is not affected.
     """
+    monitored_history = True
 
-    def __init__(self, name, *args, **kwargs):
+    def __init__(self, name, *args, deadband=0.0, max_rate=ca.MAX_UPDATE_RATE, **kwargs):
+        self.readback_filter = {'deadband': deadband, 'max_rate': max_rate}
         name_parts = name.split(':')
         units = name_parts[-1]
         kwargs['units'] = units
         self.name_root = ':'.join(name_parts[:-1])
         super().__init__(name, *args, **kwargs)
         self.connect_monitors()
+        ca.add_monitor(self.pos_fbk, self.on_monitor)
+
+    def on_monitor(self, value, timestamp):
+        # positions are buffered on arrival, before any filtering of "changed" signals, as for counters
+        history = self.history
+        if history is not None and value is not None:
+            history.add(value)
 
     def connect_monitors(self):
         """
@@ -464,10 +525,10 @@ class VMEMotor(Motor):
         self.desc_val = self.add_pv("{}:desc".format(self.name_root))
 
         if self.use_encoder:
-            self.pos_fbk = self.add_pv("{}:fbk".format(self.name))
+            self.pos_fbk = self.add_pv("{}:fbk".format(self.name), **self.readback_filter)
             self.prec_val = self.add_pv("{}:fbk.PREC".format(self.name))
         else:
-            self.pos_fbk = self.add_pv("{}:sp".format(self.name))
+            self.pos_fbk = self.add_pv("{}:sp".format(self.name), **self.readback_filter)
             self.prec_val = self.add_pv("{}:sp.PREC".format(self.name))
 
         self.status_fbk = self.add_pv("{}:status".format(self.name_root))
@@ -509,7 +570,7 @@ class APSMotor(VMEMotor):
         self.pos_tgt = self.add_pv("{}.VAL".format(self.name))
         self.prec_val = self.add_pv("{}.PREC".format(self.name))
         self.egu_val = self.add_pv("{}.EGU".format(self.name))
-        self.pos_fbk = self.add_pv("{}.RBV".format(self.name))
+        self.pos_fbk = self.add_pv("{}.RBV".format(self.name), **self.readback_filter)
         self.moving_fbk = self.add_pv("{}.DMOV".format(self.name))
         self.stop_cmd = self.add_pv("{}.STOP".format(self.name))
         self.calib_fbk = self.add_pv("{}.SET".format(self.name))
@@ -538,7 +599,7 @@ class CLSMotor(VMEMotor):
         self.pos_tgt = self.add_pv("{}".format(self.name))
         self.prec_val = self.add_pv("{}.PREC".format(self.name))
         self.egu_val = self.add_pv("{}.EGU".format(self.name))
-        self.pos_fbk = self.add_pv("{}:fbk".format(self.name))
+        self.pos_fbk = self.add_pv("{}:fbk".format(self.name), **self.readback_filter)
         self.moving_fbk = self.add_pv("{}:state".format(self.name_root))
         self.stop_cmd = self.add_pv("{}:emergStop".format(self.name_root))
         self.calib_fbk = self.add_pv("{}:isCalib".format(self.name_root))
@@ -569,13 +630,13 @@ class PseudoMotor(VMEMotor):
         if self.version == 2:
             self.moving_value = 1
             self.prec_val = self.add_pv("{}:fbk.PREC".format(self.name))
-            self.pos_fbk = self.add_pv("{}:fbk".format(self.name))
+            self.pos_fbk = self.add_pv("{}:fbk".format(self.name), **self.readback_filter)
             self.moving_fbk = self.add_pv("{}:moving".format(self.name_root))
 
         else:
             self.moving_value = 0
             self.prec_val = self.add_pv("{}:sp.PREC".format(self.name))
-            self.pos_fbk = self.add_pv("{}:sp".format(self.name))
+            self.pos_fbk = self.add_pv("{}:sp".format(self.name), **self.readback_filter)
             self.moving_fbk = self.add_pv("{}:stopped".format(self.name_root))
 
     def get_config(self):
@@ -631,3 +692,157 @@ class ResolutionMotor(BaseMotor):
     def on_motion(self, obj, value):
         moving = self.distance.is_moving() or self.energy.is_moving()
         self.set_state(busy=moving)
+
+
+class MotorGroup(object):
+    """
+    Moves several motors or positioners together and waits for all of them at once, so that independent moves
+    take as long as the slowest one instead of the sum of all of them. Moves which must be sequenced can be
+    given dependency hints, in which case they are started only after the moves they depend on have completed
+    successfully.
+
+    :param targets: dictionary mapping motors to target positions
+    :param after: optional dictionary mapping motors to a motor, or a sequence of motors, which must complete
+        before the motor is moved
+    :param timeout: maximum time in seconds to wait for each motor to stop moving
+    """
+
+    def __init__(self, targets, after=None, timeout=60 * 5):
+        self.targets = dict(targets)
+        self.after = {
+            motor: (deps,) if isinstance(deps, Device) else tuple(deps)
+            for motor, deps in (after or {}).items()
+        }
+        self.timeout = timeout
+        self.moves = {}
+
+    def get_order(self):
+        """
+        Sort the motors such that each motor comes after the motors it depends on
+
+        :return: list of motors
+        """
+        order = []
+        visiting = set()
+
+        def visit(motor):
+            if motor in order:
+                return
+            if motor in visiting:
+                raise MotorError(f'Circular move dependency involving {motor}')
+            visiting.add(motor)
+            for dep in self.after.get(motor, ()):
+                if dep in self.targets:
+                    visit(dep)
+            visiting.discard(motor)
+            order.append(motor)
+
+        for motor in self.targets:
+            visit(motor)
+        return order
+
+    def move_one(self, motor, target):
+        """
+        Move a single motor and wait for it to stop.
+
+        :param motor: motor or positioner
+        :param target: target position
+        :return: True if the move completed
+        """
+        from mxdc.devices.misc import PositionerMotor
+
+        if isinstance(motor, BaseMotor):
+            severity, context, message = motor.get_state('health') or (0, '', '')
+            if severity:
+                # the motor would refuse the move because of its health state
+                logger.warning(f'"{motor}" Move Cancelled! Reason: "{message}".')
+                return False
+        if isinstance(motor, BaseMotor) and not isinstance(motor, PositionerMotor):
+            motor.move_to(target)
+            return motor.wait_start() and motor.wait_stop(timeout=self.timeout)
+        else:
+            # positioners, also when adapted as motors, only report completion of the move
+            motor.move_to(target, wait=True)
+            return True
+
+    def launch(self, motor, dependencies):
+        """
+        Start the move of a motor in the shared worker pool once its dependencies have completed. Called from
+        the completion callbacks of the dependencies, so no worker blocks waiting for another move.
+
+        :param motor: motor or positioner
+        :param dependencies: futures of moves which must complete first
+        """
+        move = self.moves[motor]
+        if not all(dep.exception() is None and dep.result() for dep in dependencies):
+            logger.warning(f'"{motor}" Move Cancelled! A preceding move failed.')
+            move.set_result(False)
+            return
+
+        def on_done(task):
+            if task.exception() is not None:
+                move.set_exception(task.exception())
+            else:
+                move.set_result(task.result())
+
+        task = workers.submit(self.move_one, motor, self.targets[motor], name=f'Move: {motor}')
+        task.add_done_callback(on_done)
+
+    def start(self):
+        """
+        Start all moves, without waiting for them to complete
+        """
+        self.moves = {motor: futures.Future() for motor in self.targets}
+        for motor in self.get_order():
+            dependencies = [self.moves[dep] for dep in self.after.get(motor, ()) if dep in self.moves]
+            if not dependencies:
+                self.launch(motor, dependencies)
+                continue
+
+            remaining = [len(dependencies)]
+            lock = Lock()
+
+            def on_dependency(dep, motor=motor, dependencies=dependencies, remaining=remaining, lock=lock):
+                with lock:
+                    remaining[0] -= 1
+                    ready = remaining[0] == 0
+                if ready:
+                    self.launch(motor, dependencies)
+
+            for dep in dependencies:
+                dep.add_done_callback(on_dependency)
+
+    def wait(self):
+        """
+        Wait for all moves to complete, reporting each motor which failed or timed out.
+
+        :return: True if all moves completed successfully
+        """
+        # sequenced moves may each take up to the full timeout
+        done, pending = futures.wait(list(self.moves.values()), timeout=self.timeout * max(1, len(self.moves)))
+        success = True
+        for motor, move in self.moves.items():
+            if move in pending:
+                logger.warning(f'"{motor}" Timed-out. Did not reach {self.targets[motor]:g}.')
+                success = False
+            elif move.exception() is not None or not move.result():
+                logger.warning(f'"{motor}" Move to {self.targets[motor]:g} failed.')
+                success = False
+        return success
+
+
+def move_all(targets, wait=True, after=None, timeout=60 * 5):
+    """
+    Move several motors or positioners concurrently. See :class:`MotorGroup`.
+
+    :param targets: dictionary mapping motors to target positions
+    :param wait: if True, block until all moves have completed
+    :param after: optional dictionary of dependency hints, mapping motors to the motors which must complete first
+    :param timeout: maximum time in seconds to wait for each motor to stop moving
+    :return: the MotorGroup
+    """
+    group = MotorGroup(targets, after=after, timeout=timeout)
+    group.start()
+    if wait:
+        group.wait()
+    return group
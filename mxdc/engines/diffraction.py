@@ -16,6 +16,7 @@ from mxio.formats import cbf
 from mxdc import Registry, Signal, Engine
 from mxdc.devices.detector import DetectorFeatures
 from mxdc.devices.goniometer import GonioFeatures
+from mxdc.devices.motor import move_all
 from mxdc.engines.interfaces import IDataCollector, IAnalyst
 from mxdc.utils import datatools, misc, decorators, scitools
 from mxdc.utils.converter import energy_to_wavelength, dist_to_resol
@@ -124,14 +125,16 @@ class DataCollector(Engine):
         # make sure shutter is closed before starting
         self.beamline.fast_shutter.close()
 
-        # setup devices
+        # setup devices, attenuation depends on the energy so it is set after the energy move
+        targets = {}
         if abs(self.beamline.energy.get_position() - wedge['energy']) >= 0.0005:
-            self.beamline.energy.move_to(wedge['energy'], wait=True)
+            targets[self.beamline.energy] = wedge['energy']
 
         if abs(self.beamline.distance.get_position() - wedge['distance']) >= 0.1:
-            self.beamline.distance.move_to(wedge['distance'], wait=True)
+            targets[self.beamline.distance] = wedge['distance']
 
-        self.beamline.attenuator.move_to(wedge['attenuation'], wait=True)
+        targets[self.beamline.attenuator] = wedge['attenuation']
+        move_all(targets, wait=True, after={self.beamline.attenuator: self.beamline.energy})
         logger.debug('Ready for acquisition.')
 
     def run(self):
@@ -23,6 +23,9 @@ class IScanPlotter(Interface):
 
     def on_new_point(scan, data):
         """New point handler."""
+
+    def on_new_points(scan, data):
+        """New points handler, for batches of points."""
     
     def on_done(scan):
         """Done handler."""
@@ -10,13 +10,112 @@ from zope.interface import implementer
 from mxdc import Registry, Signal, Engine
 from mxdc.devices.interfaces import IMotor, ICounter
 from mxdc.engines.interfaces import IScan, IScanPlotter
-from mxdc.utils import misc, xdi
+from mxdc.utils import misc, xdi, fitting
 from mxdc.utils.log import get_module_logger
 
 # setup module logger with a default do-nothing handler
 logger = get_module_logger(__name__)
 
-MIN_CNTSCAN_UPDATE = 0.01  # minimum time between updates for continuous scans
+MIN_CNTSCAN_UPDATE = 0.1  # minimum time between progress and new-points updates for continuous scans
+SCAN_BUFFER_SIZE = 1024     # initial number of rows allocated for scan data
+FLY_SCAN_BINS = 200          # default number of position bins for fly scans
+FLY_AGGREGATES = ('mean', 'sum', 'min', 'max')
+
+
+class FlyRecorder(object):
+    """
+    Records the position stream of a motor and the value streams of counters separately, each with their own
+    timestamps, during a continuous motion. Counter values are then placed at the motor position interpolated at
+    their time of arrival, and aggregated onto a uniform grid of position bins.
+
+    Motor positions are taken from a snapshot of the position history of the motor when recording stops. Counters which keep a buffer of
+    monitored values (see :class:`mxdc.devices.counter.Counter`) are read from their buffers, while values of
+    other counters are timestamped as their "count" signals are received. All streams and the recording window
+    share the local time base of :class:`mxdc.utils.misc.HistoryBuffer`.
+
+    :param motor: slewing motor
+    :param counters: sequence of counters
+    """
+
+    def __init__(self, motor, counters):
+        self.motor = motor
+        self.counters = counters
+        self.streams = {}
+        self.handlers = {}
+        self.positions = None
+        self.start_time = self.end_time = None
+
+    def start(self):
+        """
+        Start recording
+        """
+        self.motor.enable_history(size=65536)
+        self.streams = {}
+        self.handlers = {}
+        for counter in self.counters:
+            history = getattr(counter, 'history', None)
+            if history is None:
+                history = misc.HistoryBuffer(65536)
+                self.handlers[counter] = counter.connect('count', lambda obj, value, h=history: h.add(value))
+            self.streams[counter] = history
+        self.start_time = misc.HistoryBuffer.now()
+
+    def stop(self):
+        """
+        Stop recording
+        """
+        self.end_time = misc.HistoryBuffer.now()
+        for counter, handler in self.handlers.items():
+            counter.disconnect(handler)
+        self.handlers = {}
+        self.positions = self.motor.history.copy()
+        self.motor.disable_history()
+
+    def get_values(self, edges, aggregate='mean'):
+        """
+        Aggregate the recorded counter values onto position bins
+
+        :param edges: monotonically increasing bin edges
+        :param aggregate: aggregation of values within each bin, one of 'mean', 'sum', 'min' or 'max'
+        :return: array of shape (bins, counters), nan for bins without values
+        """
+        size = len(edges) - 1
+        values = numpy.full((size, len(self.counters)), numpy.nan)
+        for i, counter in enumerate(self.counters):
+            data = self.streams[counter].get_data()
+            data = data[(data[:, 0] >= self.start_time) & (data[:, 0] <= self.end_time)]
+            positions = self.positions.value_at(data[:, 0])
+            indices = numpy.digitize(positions, edges) - 1
+            valid = (indices >= 0) & (indices < size)
+            values[:, i] = aggregate_bins(indices[valid], data[valid, 1], size, aggregate)
+        return values
+
+
+def aggregate_bins(indices, values, size, aggregate='mean'):
+    """
+    Aggregate values by bin index
+
+    :param indices: bin index of each value
+    :param values: values
+    :param size: number of bins
+    :param aggregate: one of 'mean', 'sum', 'min' or 'max'
+    :return: array of aggregated values, nan for empty bins
+    """
+    counts = numpy.bincount(indices, minlength=size)
+    if aggregate in ('mean', 'sum'):
+        result = numpy.bincount(indices, weights=values, minlength=size)
+        if aggregate == 'mean':
+            result[counts > 0] /= counts[counts > 0]
+    elif aggregate == 'min':
+        result = numpy.full(size, numpy.inf)
+        numpy.minimum.at(result, indices, values)
+    elif aggregate == 'max':
+        result = numpy.full(size, -numpy.inf)
+        numpy.maximum.at(result, indices, values)
+    else:
+        raise ValueError(f'Aggregate must be one of {FLY_AGGREGATES}')
+    result[counts == 0] = numpy.nan
+    return result
 
 
 @implementer(IScan)
@@ -26,6 +125,7 @@ class BasicScan(Engine):
 
     Signals:
         - new-point: (object,) new scan point
+        - new-points: (object,) new scan points, a structured array of rows added since the previous emission
         - new-row: (int,) new scan row for multi-row scans
         - message: (str,) messages
     """
@@ -33,6 +133,7 @@ class BasicScan(Engine):
 
     class Signals:
         new_point = Signal('new-point', arg_types=(object,))
+        new_points = Signal('new-points', arg_types=(object,))
         new_row = Signal('new-row', arg_types=(int, ))
         message = Signal('message', arg_types=(str,))
 
@@ -47,6 +148,11 @@ class BasicScan(Engine):
         self.raw_data = []
         self.data_row = []
         self.data_ids = {}
+        self.emitted_points = 0
+        self.last_emission = 0.0
+        self.stream = None
+        self.stream_file = None
+        self.streaming = False
         self.data_type = {}
         self.data_scale = []
         self.extending = False
@@ -115,11 +221,146 @@ class BasicScan(Engine):
             'extension': self.extending,
         }
 
+    def add_point(self, row):
+        """
+        Add a row of data to the scan. Rows are emitted in batches through the "new-points" signal at most every
+        MIN_CNTSCAN_UPDATE seconds.
+
+        :param row: sequence of values, one per column
+        """
+        self.raw_data.append(row)
+        if time.time() - self.last_emission >= MIN_CNTSCAN_UPDATE:
+            self.flush_points()
+
+    def flush_points(self):
+        """
+        Emit all rows added since the previous emission through the "new-points" signal
+        """
+        if not isinstance(self.raw_data, misc.RecordArray):
+            return  # scans which manage their own data
+        count = len(self.raw_data)
+        if count > self.emitted_points:
+            points = self.raw_data.data[self.emitted_points:count].copy()
+            self.emitted_points = count
+            if self.streaming and not self.stream:
+                self.open_stream()   # includes all rows so far
+            elif self.stream:
+                self.write_stream(points)
+            self.emit('new-points', points, force=True)
+        self.last_emission = time.time()
+
+    def open_stream(self):
+        """
+        Start streaming scan data to a partial XDI file next to the final data file, including any data
+        already collected. Called when rows are first flushed, so only scans which add their data through
+        :func:`add_point` are streamed. The partial file is removed once the data has been saved, otherwise it can be
+        reloaded with :func:`mxdc.utils.xdi.read_xdi`. Failure to open or write the file is logged and does not stop
+        the scan.
+        """
+        self.close_stream(remove=True)  # the new file will include all rows of any previous one
+        try:
+            filename = self.get_filename(suffix=xdi.PARTIAL_SUFFIX, extension='.xdi')
+            xdi_data = self.prepare_xdi(data=numpy.empty(0, dtype=self.data_type))
+            self.stream = xdi.XDIWriter(filename, xdi_data)
+            self.stream_file = filename
+            if len(self.raw_data):
+                self.stream.write(self.raw_data.data)
+        except Exception as e:
+            logger.warning(f'Scan data will not be streamed to disk: {e}')
+            self.stop_streaming()
+
+    def write_stream(self, points):
+        """
+        Append rows to the partial data file. Streaming stops, without stopping the scan, if the rows can not be
+        written, for example when the disk is full. The partial file is kept with the rows written so far.
+
+        :param points: structured array of rows
+        """
+        try:
+            self.stream.write(points)
+        except Exception as e:
+            logger.warning(f'Streaming of scan data to disk stopped: {e}')
+            self.stop_streaming()
+
+    def stop_streaming(self):
+        """
+        Stop streaming after a failure, dropping the stream even if it can not be closed cleanly
+        """
+        self.streaming = False
+        try:
+            self.close_stream()
+        except Exception as e:
+            logger.debug(f'Partial data file not closed cleanly: {e}')
+        finally:
+            self.stream = None
+
+    def close_stream(self, remove=False):
+        """
+        Stop streaming scan data
+
+        :param remove: if True, delete the partial data file
+        """
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        if remove and self.stream_file:
+            if os.path.exists(self.stream_file):
+                os.remove(self.stream_file)
+            self.stream_file = None
+
+    def get_reference(self):
+        """
+        Get the reference (i0) value of the first row of data, used for normalization.
+        """
+        return self.raw_data.data[self.data_type['names'][-1]][0]
+
+    def get_fly_edges(self, p1, p2):
+        """
+        Get the edges of the position bins of a fly scan segment, in increasing order
+
+        :param p1: start position of the segment
+        :param p2: end position of the segment
+        :return: array of bin edges. The configured bin width is adjusted so that a whole number of bins spans the
+            segment, and a stationary segment gives a single bin centred on the position.
+        """
+        low, high = min(p1, p2), max(p1, p2)
+        if high == low:
+            half_width = (self.config.bin_width or 1.0) / 2
+            return numpy.array([low - half_width, high + half_width])
+        elif self.config.bin_width:
+            bins = max(1, int(round((high - low) / self.config.bin_width)))
+        else:
+            bins = FLY_SCAN_BINS
+        return numpy.linspace(low, high, bins + 1)
+
+    def add_fly_points(self, recorder, p1, p2, *positions):
+        """
+        Bin the values recorded during a fly scan segment and add them to the scan data, one row per bin in the
+        order of motion. Bins without values for every counter are dropped.
+
+        :param recorder: FlyRecorder for the segment
+        :param p1: start position of the segment
+        :param p2: end position of the segment
+        :param positions: fixed positions of other motors for the segment
+        """
+        edges = self.get_fly_edges(p1, p2)
+        values = recorder.get_values(edges, self.config.aggregate)
+        centers = (edges[:-1] + edges[1:]) / 2
+        valid = ~numpy.isnan(values).any(axis=1)
+        centers, values = centers[valid], values[valid]
+        if p2 < p1:
+            centers, values = centers[::-1], values[::-1]
+        if self.config.i0 and len(values):
+            reference = self.get_reference() if len(self.raw_data) else values[0, -1]
+            values = numpy.column_stack([values[:, 0] * reference / values[:, -1], values])
+        for center, row in zip(centers, values):
+            self.add_point((center, *positions, *row))
+
     def finalize(self):
         """
-        Convert the data after the scan is complete and finalize before wrapping up
+        Finalize the data after the scan is complete before wrapping up. The data is a view of the scan buffer.
         """
-        self.data = numpy.array(self.raw_data, self.data_type)
+        self.data = self.raw_data.data
 
     def extend(self, amount):
         """
@@ -136,7 +377,7 @@ class BasicScan(Engine):
         Start the scan engine
         """
         self.stopped = False
-        super().start()
+        return super().start()
 
     def run(self):
         """
@@ -147,12 +388,19 @@ class BasicScan(Engine):
 
         if not self.extending:
             self.config.update(start_time=datetime.now(tz=pytz.utc))
-            self.raw_data = []
+            self.raw_data = misc.RecordArray(self.data_type, size=SCAN_BUFFER_SIZE)
+            self.emitted_points = 0
             self.data_row = [numpy.nan] * len(self.data_type['names'])
             self.data_row[-1] = 1.0  # make sure last column default (i0) is 1.0
 
+        self.streaming = True
         self.set_state(busy=True, message='Scan in progress', started=self.get_specs())
-        self.scan()
+        try:
+            self.scan()
+            self.flush_points()
+        finally:
+            self.streaming = False
+            self.close_stream()
         self.config.update(end_time=datetime.now(tz=pytz.utc))
         self.finalize()
         self.set_state(busy=False, done=self.config, message='Scan complete!')
@@ -202,26 +450,37 @@ class BasicScan(Engine):
         :return: the file name of the saved file
         """
         if filename is None:
-            # save in ~/Scans/YYYY/Mmm/HHMMSS{suffix}.xdi.gz
-            directory = self.config.get(
-                'directory',
-                os.path.join(
-                    misc.get_project_home(),
-                    'Scans',
-                    time.strftime('%Y'),
-                    time.strftime('%b')
-                )
-            )
-            name = '{}-{}{}.xdi.gz'.format(self.data_type['names'][0], time.strftime('%H%M%S'), suffix)
-            if not os.path.exists(directory):
-                os.makedirs(directory)
-            filename = os.path.join(directory, name)
+            filename = self.get_filename(suffix=suffix)
 
         logger.debug('Saving XDI: {}'.format(filename))
         xdi_data = self.prepare_xdi()
         xdi_data.save(filename)
+        self.close_stream(remove=True)
         return filename
 
+    def get_filename(self, suffix='', extension='.xdi.gz'):
+        """
+        Generate a file name for the scan data, creating the directory if necessary
+
+        :param suffix: text to add to the filename before the extension
+        :param extension: file name extension
+        :return: full path of the file
+        """
+        # save in ~/Scans/YYYY/Mmm/HHMMSS{suffix}.xdi.gz
+        directory = self.config.get(
+            'directory',
+            os.path.join(
+                misc.get_project_home(),
+                'Scans',
+                time.strftime('%Y'),
+                time.strftime('%b')
+            )
+        )
+        name = '{}-{}{}{}'.format(self.data_type['names'][0], time.strftime('%H%M%S'), suffix, extension)
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        return os.path.join(directory, name)
+
 
 class SlewScan(BasicScan):
     """
@@ -233,18 +492,26 @@ class SlewScan(BasicScan):
     :param counters: one or more counters
     :param i0: reference counter
     :param speed:  scan speed of m1
+    :param fly: if True, record motor and counter streams separately and bin the counts by position,
+        see :class:`FlyRecorder`
+    :param bin_width: width of position bins for fly scans, defaults to 1/200 of the scan range
+    :param aggregate: aggregation of counts within position bins for fly scans, one of 'mean', 'sum', 'min', 'max'
     """
 
-    def __init__(self, m1, p1, p2, *counters, i0=None, speed=None):
+    def __init__(self, m1, p1, p2, *counters, i0=None, speed=None, fly=False, bin_width=None, aggregate='mean'):
         super().__init__()
         assert len(counters) > 0, ValueError('At least one counter is required.')
+        assert aggregate in FLY_AGGREGATES, ValueError(f'Aggregate must be one of {FLY_AGGREGATES}')
         self.configure(
             m1=IMotor(m1),
             p1=p1,
             p2=p2,
             counters=counters,
             i0=i0,
-            speed=speed
+            speed=speed,
+            fly=fly,
+            bin_width=bin_width,
+            aggregate=aggregate,
         )
         self.setup((self.config.m1,), self.config.counters, i0)
         self.last_update = time.time()
@@ -255,16 +522,42 @@ class SlewScan(BasicScan):
         self.data_row[channel] = value
         # When i0 is specified, add scaled value of first channel, last channel is i0
         if self.config.i0 and channel == self.config.start_channel and len(self.raw_data):
-            self.data_row[1] = value * self.raw_data[0][-1] / self.data_row[-1]
-        row = tuple(self.data_row)
-        progress = abs((self.data_row[0] - self.config.p1)/(self.config.p2 - self.config.p1))
+            self.data_row[1] = value * self.get_reference() / self.data_row[-1]
 
-        # only emit when non-motor row changes value
+        # only record when non-motor row changes value
         if channel != 0:
-            self.raw_data.append(row)
-            self.set_state(new_point=(row,))
-        self.set_state(progress=(progress, ''))
-        self.last_update = time.time()
+            self.add_point(self.data_row)
+
+        now = time.time()
+        if now - self.last_update >= MIN_CNTSCAN_UPDATE:
+            progress = abs((self.data_row[0] - self.config.p1)/(self.config.p2 - self.config.p1))
+            self.set_state(progress=(progress, ''))
+            self.last_update = now
+
+    def on_fly_progress(self, motor, position):
+        now = time.time()
+        if now - self.last_update >= MIN_CNTSCAN_UPDATE:
+            progress = abs((position - self.config.p1) / (self.config.p2 - self.config.p1))
+            self.set_state(progress=(progress, ''))
+            self.last_update = now
+
+    def fly_scan(self):
+        """
+        Move the motor to the end position while recording motor and counter streams, then bin the counts.
+        """
+        recorder = FlyRecorder(self.config.m1, self.config.counters)
+        progress_id = self.config.m1.connect('changed', self.on_fly_progress)
+        recorder.start()
+        for counter in self.config.counters:
+            counter.start()
+
+        self.config.m1.move_to(self.config.p2, wait=True)
+
+        for counter in self.config.counters:
+            counter.stop()
+        recorder.stop()
+        self.config.m1.disconnect(progress_id)
+        self.add_fly_points(recorder, self.config.p1, self.config.p2)
 
     def extend(self, amount):
         direction = numpy.sign(self.config.p2 - self.config.p1)
@@ -282,6 +575,11 @@ class SlewScan(BasicScan):
         self.config.m1.move_to(self.config.p1, wait=True)
         self.config.m1.configure(speed=self.config.speed)
 
+        if self.config.fly:
+            self.fly_scan()
+            self.config.m1.configure(**motor_conf)
+            return
+
         # initialize row connect devices
         self.data_row[0] = self.config.m1.get_position()
 
@@ -309,10 +607,12 @@ class SlewScan(BasicScan):
 
     def finalize(self):
         """
-        Slew Scan needs special processing to average duplicates
+        Slew Scan needs special processing to average duplicates, fly scans are already binned
         """
 
-        self.data = numpy.array(self.raw_data, self.data_type)
+        self.data = self.raw_data.data
+        if self.config.fly:
+            return
         self.save(suffix='-raw')
         self.step_data = self.data
 
@@ -386,8 +686,7 @@ class AbsScan(BasicScan):
                 counts = (counts[0]*ref_value/counts[-1],) + counts
 
             row = (x,) + counts
-            self.raw_data.append(row)
-            self.emit("new-point", row)
+            self.add_point(row)
             self.emit("progress", (i + 1.0)/self.config.steps, "")
             time.sleep(0)
 
@@ -410,6 +709,126 @@ class RelScan(AbsScan):
         super().__init__(m1, cur+p1, cur+p2, steps, exposure, *counters, i0=i0)
 
 
+class AdaptiveScan(BasicScan):
+    """
+    An absolute scan of a single motor with adaptive point density. The range is first scanned coarsely, then
+    intervals are repeatedly subdivided where the signal changes fastest until no interval exceeds the tolerance
+    or the point budget is used up. Points are therefore not recorded or emitted in order of position, which is
+    indicated to plotters by the "unordered" entry of the scan specification, but the final data is sorted by
+    position. Adaptive scans can not be extended.
+
+    :param m1: motor or positioner
+    :param p1: absolute start position
+    :param p2: absolute end position
+    :param exposure: count time at each point
+    :param counters: one or more counters
+    :param i0: reference counter
+    :param coarse: number of points in the initial coarse scan
+    :param max_points: maximum total number of points
+    :param tolerance: largest acceptable change of the signal between neighbouring points, as a fraction of the
+        signal range
+    :param min_step: smallest interval to subdivide, defaults to 1/1000 of the scan range
+    :param criterion: refinement criterion, 'derivative' to refine where the signal changes the most between
+        neighbouring points, or 'peak' to also refine the region within one FWHM of the peak, estimated with
+        :func:`mxdc.utils.fitting.histogram_fit`, to a resolution of 1/10 of the FWHM.
+    """
+
+    def __init__(self, m1, p1, p2, exposure, *counters, i0=None, coarse=11, max_points=101, tolerance=0.05,
+                 min_step=None, criterion='derivative'):
+        super().__init__()
+        assert len(counters) > 0, ValueError('At least one counter is required.')
+        assert criterion in ('derivative', 'peak'), ValueError('Criterion must be "derivative" or "peak"')
+        self.configure(
+            m1=IMotor(m1),
+            p1=p1,
+            p2=p2,
+            exposure=exposure,
+            counters=counters,
+            i0=i0,
+            coarse=max(3, coarse),
+            max_points=max(coarse, max_points),
+            tolerance=tolerance,
+            min_step=min_step if min_step else abs(p2 - p1) / 1000,
+            criterion=criterion,
+        )
+        self.setup((self.config.m1,), counters, i0)
+        self.ref_value = 1.0
+
+    def get_specs(self):
+        specs = super().get_specs()
+        specs.update(unordered=True)
+        return specs
+
+    def extend(self, amount):
+        raise NotImplementedError('Adaptive scans can not be extended')
+
+    def measure(self, positions):
+        """
+        Measure the given positions in order and add them to the scan data
+
+        :param positions: sequence of positions
+        :return: False if the scan was stopped
+        """
+        for x in positions:
+            if self.stopped:
+                logger.info("Scan stopped!")
+                return False
+            self.config.m1.move_to(x, wait=True)
+            counts = misc.multi_count(self.config.exposure, *self.config.counters)
+            if self.config.i0:
+                if not len(self.raw_data):
+                    self.ref_value = counts[-1]
+                counts = (counts[0] * self.ref_value / counts[-1],) + counts
+            self.add_point((x,) + counts)
+            self.emit("progress", len(self.raw_data) / self.config.max_points, "")
+        return True
+
+    def get_refinements(self):
+        """
+        Determine new positions at the midpoints of the intervals which need refinement
+
+        :return: array of new positions, in order of priority
+        """
+        data = numpy.sort(self.raw_data.data, order=self.data_type['names'][0])
+        x = data[self.data_type['names'][0]].astype(float)
+        y = data[self.data_type['names'][1]].astype(float)
+        widths = numpy.diff(x)
+        y_range = numpy.ptp(y) or 1.0
+
+        # score intervals by the fraction of the signal range they span, relative to the tolerance
+        scores = numpy.abs(numpy.diff(y)) / y_range / self.config.tolerance
+        if self.config.criterion == 'peak':
+            (ymax, fwhm, xpeak, left, right, cema), success = fitting.histogram_fit(x, y)
+            if success and fwhm > 0:
+                near_peak = (x[1:] >= xpeak - fwhm) & (x[:-1] <= xpeak + fwhm)
+                scores = numpy.where(near_peak, numpy.maximum(scores, widths / (fwhm / 10)), scores)
+
+        candidates = (scores > 1.0) & (widths > 2 * self.config.min_step)
+        order = numpy.argsort(scores[candidates])[::-1]
+        return ((x[:-1] + widths / 2)[candidates])[order]
+
+    def scan(self):
+        if not self.measure(numpy.linspace(self.config.p1, self.config.p2, self.config.coarse)):
+            return
+
+        while len(self.raw_data) < self.config.max_points:
+            positions = self.get_refinements()[:self.config.max_points - len(self.raw_data)]
+            if not len(positions):
+                break
+            # visit new positions in the direction of the scan to minimize motor travel
+            positions = numpy.sort(positions)
+            if self.config.p2 < self.config.p1:
+                positions = positions[::-1]
+            if not self.measure(positions):
+                break
+
+    def finalize(self):
+        """
+        Sort the data by position
+        """
+        self.data = numpy.sort(self.raw_data.data, order=self.data_type['names'][0])
+
+
 class AbsScan2(BasicScan):
     """
     Sequential Absolute scan of two motors.
@@ -481,8 +900,7 @@ class AbsScan2(BasicScan):
                 counts = (counts[0]*ref_value/counts[-1],) + counts
 
             row = (x1, x2, ) + counts
-            self.raw_data.append(row)
-            self.emit("new-point", row)
+            self.add_point(row)
             self.emit("progress", (i + 1.0) / self.config.steps, "")
             time.sleep(0)
 
@@ -555,7 +973,11 @@ class GridScan(BasicScan):
 
     def get_specs(self):
         specs = super().get_specs()
-        specs['grid_snake'] = self.config.snake
+        specs.update(
+            grid_snake=self.config.snake,
+            grid_shape=(self.config.steps_2, self.config.steps_1),
+            grid_extent=(self.config.p11, self.config.p12, self.config.p21, self.config.p22),
+        )
         return specs
 
     def extend(self, steps):
@@ -589,10 +1011,10 @@ class GridScan(BasicScan):
 
                 position = j + i * self.config.steps_2
                 row = (x1, x2,) + counts
-                self.raw_data.append(row)
-                self.emit("new-point", row)
+                self.add_point(row)
                 self.emit("progress", position / total_points, "")
                 time.sleep(0)
+            self.flush_points()
             self.emit('new-row', i + 1)
 
 
@@ -611,10 +1033,16 @@ class SlewGridScan(BasicScan):
     :param counters: one or more counters
     :param i0: reference counter
     :param speed:  scan speed of m1
+    :param fly: if True, record motor and counter streams separately and bin the counts of each row onto the same
+        positions, see :class:`FlyRecorder`
+    :param bin_width: width of position bins for fly scans, defaults to 1/200 of the slew range
+    :param aggregate: aggregation of counts within position bins for fly scans, one of 'mean', 'sum', 'min', 'max'
     """
 
-    def __init__(self, m1, p11, p12, m2, p21, p22, steps, exposure, *counters, i0=None, speed=None):
+    def __init__(self, m1, p11, p12, m2, p21, p22, steps, exposure, *counters, i0=None, speed=None, fly=False,
+                 bin_width=None, aggregate='mean'):
         super().__init__()
+        assert aggregate in FLY_AGGREGATES, ValueError(f'Aggregate must be one of {FLY_AGGREGATES}')
         positions = numpy.linspace(p21, p22, steps)
         self.configure(
             m1=IMotor(m1),
@@ -630,7 +1058,10 @@ class SlewGridScan(BasicScan):
             position=0,
             positions=positions,
             step_size=positions[1] - positions[0],
-            speed=speed
+            speed=speed,
+            fly=fly,
+            bin_width=bin_width,
+            aggregate=aggregate,
         )
         self.setup((self.config.m1, self.config.m2,), counters, i0)
         self.cur_count = 0
@@ -639,23 +1070,62 @@ class SlewGridScan(BasicScan):
 
     def get_specs(self):
         specs = super().get_specs()
-        specs['grid_snake'] = True  # Slew Grids are always snake grids
+        if self.config.fly:
+            # fly scan rows are binned on the same positions
+            centers = self.get_fly_edges(self.config.p11, self.config.p12)
+            centers = (centers[:-1] + centers[1:]) / 2
+            columns, x1, x2 = len(centers), centers[0], centers[-1]
+        else:
+            # the number of points per row is only known after the first row
+            columns, x1, x2 = None, self.config.p11, self.config.p12
+        specs.update(
+            grid_snake=True,  # Slew Grids are always snake grids
+            grid_shape=(self.config.steps, columns),
+            grid_extent=(x1, x2, self.config.p21, self.config.p22),
+        )
         return specs
 
     def on_data(self, device, value, channel):
         self.data_row[channel] = value
         if self.config.i0 and channel == self.config.start_channel and len(self.raw_data):
-            self.data_row[1] = value * self.raw_data[0][-1] / self.data_row[-1]
+            self.data_row[1] = value * self.get_reference() / self.data_row[-1]
 
-        row = tuple(self.data_row)
-        self.raw_data.append(row)
+        self.add_point(self.data_row)
 
-        self.set_state(new_point=(row,))
-        outer_progress = self.cur_count / self.config.steps
-        inner_progress = abs((self.data_row[0] - self.cur_origin) / (self.config.p12 - self.config.p11))/self.config.steps
-        progress = outer_progress + inner_progress
-        self.set_state(progress=(progress, ''))
-        self.last_update = time.time()
+        now = time.time()
+        if now - self.last_update >= MIN_CNTSCAN_UPDATE:
+            outer_progress = self.cur_count / self.config.steps
+            inner_progress = abs((self.data_row[0] - self.cur_origin) / (self.config.p12 - self.config.p11))/self.config.steps
+            progress = outer_progress + inner_progress
+            self.set_state(progress=(progress, ''))
+            self.last_update = now
+
+    def fly_row(self, index, target, position):
+        """
+        Slew the inner motor to the target position while recording motor and counter streams, then bin the
+        counts of the row.
+
+        :param index: row index
+        :param target: end position of the inner motor
+        :param position: position of the outer motor
+        """
+        recorder = FlyRecorder(self.config.m1, self.config.counters)
+        recorder.start()
+        for counter in self.config.counters:
+            counter.start()
+
+        self.config.m1.move_to(target, wait=True)
+
+        for counter in self.config.counters:
+            counter.stop()
+        recorder.stop()
+
+        # all rows are binned on the same positions
+        origin = self.config.p11 if target == self.config.p12 else self.config.p12
+        self.add_fly_points(recorder, origin, target, position)
+        self.flush_points()
+        self.set_state(progress=((index + 1) / self.config.steps, ''))
+        self.emit('new-row', index + 1)
 
     def extend(self, steps):
         self.config.position = self.config.steps
@@ -693,6 +1163,11 @@ class SlewGridScan(BasicScan):
 
             # INNER Slew Scan
             # prepare data recorder
+            x1 = [self.config.p12, self.config.p11][i % 2]  # alternate p11 and p12
+            if self.config.fly:
+                self.fly_row(i, x1, x2)
+                continue
+
             self.data_ids[self.config.m1] = self.config.m1.connect('changed', self.on_data, slew_channel)
             self.data_ids.update({
                 dev: dev.connect('count', self.on_data, i + self.config.start_channel)
@@ -704,10 +1179,10 @@ class SlewGridScan(BasicScan):
                 counter.start()
 
             # move motor to start or end
-            x1 = [self.config.p12, self.config.p11][i % 2]  # alternate p11 and p12
             self.cur_origin = self.config.m1.get_position()
             self.config.m1.move_to(x1, wait=True)
 
+            self.flush_points()
             self.emit('new-row', i+1)
 
             # disconnect data monitor at the end
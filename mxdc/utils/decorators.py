@@ -1,4 +1,3 @@
-import threading
 import time
 
 from functools import wraps
@@ -26,19 +25,15 @@ def memoize(f):
 
 def async_call(f):
     """
-    Run the specified function asynchronously in a thread. Return values will not be available
+    Run the specified function asynchronously in the shared worker pool. The decorated function returns a
+    :class:`concurrent.futures.Future` for the result
     :param f: function or method
     """
-    from mxdc.com.ca import threads_init
-
-    def new_f(*args, **kwargs):
-        threads_init()  # enable epics environment to be active within thread
-        return f(*args, **kwargs)
+    from mxdc.utils.workers import submit
 
     @wraps(f)
     def _f(*args, **kwargs):
-        worker = threading.Thread(target=new_f, args=args, kwargs=kwargs, daemon=True, name=f'Async Call: {f.__name__}')
-        worker.start()
+        return submit(f, *args, name=f'Async Call: {f.__name__}', **kwargs)
 
     return _f
 
@@ -9,7 +9,7 @@ import matplotlib
 import numpy
 import threading
 import time
-from collections import deque
+from collections import deque, OrderedDict
 from enum import Enum
 from pathlib import Path
 
@@ -31,6 +31,8 @@ LABEL_GAP = 0.0075  # Annotation label gap
 COLOR_MAPS = ('binary', 'inferno')
 MAX_SAVE_JITTER = 0.5  # maximum amount of time in seconds to wait for file to be done writing to disk
 MAX_FILE_FREQUENCY = 5
+STATS_STRIDE = 4  # stride along both axes of the pixels sampled for contrast statistics
+STATS_CACHE_SIZE = 32  # number of datasets for which contrast statistics are kept
 
 
 class DataMonitor(Engine):
@@ -282,6 +284,71 @@ class InvalidFrameData(Exception):
     ...
 
 
+def get_stats_data(data, cutoff, stride=STATS_STRIDE):
+    """
+    Select the pixels used for contrast statistics, the valid pixels of the first quadrant of the frame sampled
+    every `stride` pixels along both axes. Pixels are valid if they are not negative and below the cutoff.
+
+    :param data: 2D frame data
+    :param cutoff: saturated value
+    :param stride: sampling stride
+    :return: 1D array of pixel values, or the sampled pixels if none are valid
+    """
+    rows, cols = data.shape
+    sample = data[:rows // 2:stride, :cols // 2:stride]
+    selected = (sample >= 0) & (sample < cutoff)
+    return sample.ravel() if not selected.any() else sample[selected]
+
+
+class ContrastCache(object):
+    """
+    Contrast statistics (average, minimum, maximum) of recently displayed datasets, so that frames of the same
+    series are displayed with the same contrast without recalculating it. Entries are keyed by the dataset identifier
+    together with the frame size and saturated value, so that a new dataset which reuses an identifier with a
+    different detector geometry or data range does not get stale statistics.
+    """
+    entries = OrderedDict()
+    lock = threading.Lock()
+
+    @classmethod
+    def key(cls, dataset, frame):
+        """
+        Get the cache key of a frame
+
+        :param dataset: dataset of the frame
+        :param frame: frame
+        :return: hashable key
+        """
+        return dataset.identifier, frame.size.x, frame.size.y, frame.cutoff_value
+
+    @classmethod
+    def get(cls, key):
+        """
+        Get the statistics for a dataset
+
+        :param key: cache key, see :func:`key`
+        :return: (average, minimum, maximum) tuple or None
+        """
+        with cls.lock:
+            if key in cls.entries:
+                cls.entries.move_to_end(key)
+                return cls.entries[key]
+
+    @classmethod
+    def set(cls, key, stats):
+        """
+        Save the statistics for a dataset, removing the least recently used ones beyond STATS_CACHE_SIZE
+
+        :param key: cache key, see :func:`key`
+        :param stats: (average, minimum, maximum) tuple
+        """
+        with cls.lock:
+            cls.entries[key] = stats
+            cls.entries.move_to_end(key)
+            while len(cls.entries) > STATS_CACHE_SIZE:
+                cls.entries.popitem(last=False)
+
+
 @dataclass
 class DisplayFrame:
     dataset: DataSet
@@ -289,7 +356,7 @@ class DisplayFrame:
     settings: Union[ScaleSettings, None] = field(repr=False, default=None)
     color_map: Any = field(init=False, repr=False)
     data: numpy.ndarray = field(init=False, repr=False)
-    stats_data: numpy.ndarray = field(init=False, repr=False)
+    stats_data: numpy.ndarray = field(init=False, repr=False, default=None)
     image: Any = field(init=False, repr=False)
     redraw: bool = False
     dirty: bool = True
@@ -322,14 +389,16 @@ class DisplayFrame:
         if self.data is None:
             raise InvalidFrameData("Data appears invalid!")
 
-        w, h = frame.data.shape
-        sub_data = frame.data[:h//2, :w//2]
-        selected = (sub_data >= 0) & (sub_data < self.saturated_value)
-        self.stats_data = sub_data if not selected.sum() else sub_data[selected]
-
         if self.settings is None:
-            minimum, maximum = numpy.percentile(self.stats_data, MIN_MAX_PERCENTILES)
-            self.settings = ScaleSettings(average=frame.average, maximum=maximum, minimum=minimum)
+            key = ContrastCache.key(self.dataset, frame)
+            stats = ContrastCache.get(key)
+            if stats is None:
+                self.stats_data = get_stats_data(frame.data, self.saturated_value)
+                minimum, maximum = numpy.percentile(self.stats_data, MIN_MAX_PERCENTILES)
+                stats = (frame.average, minimum, maximum)
+                ContrastCache.set(key, stats)
+            average, minimum, maximum = stats
+            self.settings = ScaleSettings(average=average, maximum=maximum, minimum=minimum)
 
         self.setup()
         radii = numpy.arange(0, int(1.4142 * self.size.x / 2), RESOLUTION_STEP_SIZE / self.pixel_size)[1:]
@@ -50,12 +50,13 @@ class LoopRecorder:
         """
         super().__init__()
         self.objects = []
-        self.angles = []
         self.running = False
         self.stopped = False
         self.device = device
         self.spindle = spindle
         self.total_angle = total
+        self.positions = None
+        self.history_enabled = False
         self.stats = {}
 
     def run(self):
@@ -65,8 +66,6 @@ class LoopRecorder:
         self.running = True
         self.stopped = False
         self.objects = []    # Clear the previous data
-        self.angles = []
-        cb_id = self.spindle.connect('changed', self.save_angle)
 
         while self.running:
             obj = self.device.get_object(label='loop')
@@ -74,14 +73,9 @@ class LoopRecorder:
                 self.objects.append(obj)
             time.sleep(0.001)
 
-        self.spindle.disconnect(cb_id)
-
         self.calc_stats()
         self.stopped = True
 
-    def save_angle(self, obj, position):
-        self.angles.append([time.time(), position])
-
     def has_objects(self):
         """
         Check if there are any objects recorded
@@ -122,12 +116,11 @@ class LoopRecorder:
         Get the face angle for the recorded loops
         """
 
-        angles = numpy.array(self.angles)
         target = self.spindle.get_position()
         if self.objects:
             obj_times = numpy.array([obj.time for obj in self.objects if obj is not None and obj.label == 'loop'])
             obj_heights = numpy.array([obj.h for obj in self.objects if obj is not None and obj.label == 'loop'])
-            obj_angles = numpy.interp(obj_times, angles[:, 0], angles[:, 1], left=0, right=0)
+            obj_angles = self.positions.value_at(obj_times, left=0, right=0)
 
             target = (obj_angles[numpy.argmin(obj_heights)] + 90.0) % 360
 
@@ -150,6 +143,10 @@ class LoopRecorder:
         Start the loop recorder in a separate thread
         """
         if not self.running:
+            self.positions = None
+            if not self.history_enabled:
+                self.spindle.enable_history()
+                self.history_enabled = True
             worker_thread = Thread(target=self.run, daemon=True, name=self.__class__.__name__)
             worker_thread.start()
 
@@ -166,6 +163,11 @@ class LoopRecorder:
 
     def stop(self):
         self.running = False
+        if self.history_enabled:
+            # keep the spindle positions recorded so far and release the spindle history enabled by start()
+            self.history_enabled = False
+            self.positions = self.spindle.history.copy()
+            self.spindle.disable_history()
         self.stopped = True
 
     def __del__(self):
@@ -149,7 +149,10 @@ def get_project_id():
 
 def multi_count(exposure, *counters):
     """
-    Count multiple devices asynchronously
+    Count multiple devices asynchronously. Gated counters are integrated together over a single time window
+    in the calling thread, while all other devices count in the shared worker pool, or in dedicated threads when
+    called from a worker of the pool, so that a worker never blocks on other tasks of the same pool.
+
     :param exposure: count time
     :param counters: list of counters to count
     :return: tuple of floats corresponding to count results, multi-element counters will have multiple entries in this tuple
@@ -158,18 +161,22 @@ def multi_count(exposure, *counters):
     if len(counters) == 1:
         return counters[0].count(exposure),
     else:
-        counts = [0.0] * len(counters)
-
-        def count(device, exposure, i):
-            ca.threads_init()
-            counts[i] = device.count(exposure)
-
-        threads = []
-        for i, device in enumerate(counters):
-            threads.append(threading.Thread(target=count, args=(device, exposure, i,)))
-        [th.start() for th in threads]
-        [th.join() for th in threads]
-        return tuple(counts)
+        from mxdc.utils import workers
+        run = workers.spawn if workers.POOL.is_worker() else workers.submit
+        futures = {
+            i: run(device.count, exposure, name=f'Count: {device.name}')
+            for i, device in enumerate(counters) if not getattr(device, 'gated', False)
+        }
+        results = {}
+        if len(futures) < len(counters):
+            start = HistoryBuffer.now()
+            time.sleep(exposure)
+            end = HistoryBuffer.now()
+            results = {
+                i: device.get_count(start, end) for i, device in enumerate(counters) if i not in futures
+            }
+        results.update({i: future.result() for i, future in futures.items()})
+        return tuple(results[i] for i in range(len(counters)))
 
 
 # def slugify(s, empty=""):
@@ -405,14 +412,88 @@ def load_binary_data(filename):
     return data
 
 
+class HistoryBuffer(object):
+    """
+    Fixed-size ring buffer of timestamped values, such as motor positions or counter readings. Values can be
+    queried for any time within the buffered period without copying per-sample Python objects. Access is
+    serialized so that readers always see a consistent copy while values are being added. Entries added without
+    a timestamp are stamped with :func:`now`, which should also be used for any time windows applied to the buffer.
+
+    :param size: maximum number of (timestamp, value) entries to keep
+    """
+
+    def __init__(self, size=4096):
+        self.size = size
+        self.data = numpy.zeros((size, 2))
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def add(self, value, timestamp=None):
+        """
+        Add a value to the buffer, replacing the oldest entry when full
+
+        :param value: value
+        :param timestamp: time of the value, defaults to the current time
+        """
+        with self.lock:
+            self.data[self.count % self.size] = (self.now() if timestamp is None else timestamp, value)
+            self.count += 1
+
+    @staticmethod
+    def now():
+        """
+        Get the current time in the time base of history buffers
+        """
+        return time.time()
+
+    def get_data(self):
+        """
+        Get a copy of the buffered entries in chronological order
+
+        :return: array of shape (N, 2) with timestamps in the first column and values in the second
+        """
+        with self.lock:
+            count = self.count
+            if count <= self.size:
+                return self.data[:count].copy()
+            else:
+                return numpy.roll(self.data, -(count % self.size), axis=0)
+
+    def copy(self):
+        """
+        Get an independent snapshot of the buffer
+        """
+        data = self.get_data()
+        snapshot = HistoryBuffer(max(len(data), 1))
+        snapshot.data[:len(data)] = data
+        snapshot.count = len(data)
+        return snapshot
+
+    def value_at(self, times, left=None, right=None):
+        """
+        Interpolate the values at the given times
+
+        :param times: a time or an array of times
+        :param left: value for times before the first entry, defaults to the first value
+        :param right: value for times after the last entry, defaults to the last value
+        :return: value or array of values
+        """
+        data = self.get_data()
+        if not len(data):
+            return numpy.full_like(numpy.asarray(times, dtype=float), numpy.nan)
+        return numpy.interp(times, data[:, 0], data[:, 1], left=left, right=right)
+
+
 class RecordArray(object):
     """
-    Record Array Manager for numpy structured arrays.
+    Record Array Manager for numpy structured arrays. Records are stored in a contiguous buffer between head and
+    tail indices which grows by 50% when full, or in ring buffer mode, is reallocated with the most recent records
+    once the tail reaches the end, so that appending is amortised O(1) in both modes. Interpolation functions are
+    built only when needed and cached until the data changes.
 
     :param dtype: numpy dtype dictionary
-    :param size: default allocation size of record array
+    :param size: default allocation size of record array, maximum number of records in ring buffer mode
     :param loop: whether to use ring buffer
-    :param grid: whether to use grid mode processing
     :param data: optional record array to initialize to, dtype ignored
     """
 
@@ -420,31 +501,34 @@ class RecordArray(object):
         self.dtype = numpy.dtype(dtype)
         self.lock = threading.Lock()
         self.loop = loop
-        self.length = 0
         self.size = size
+        self.head = 0
+        self.tail = 0
         self.funcs = {}
+        self.stale = False
 
         if data is None:
-            self._data = numpy.empty(self.size, dtype=self.dtype)
+            self._data = numpy.empty(2 * self.size if self.loop else self.size, dtype=self.dtype)
         else:
             self._data = data
             self.dtype = data.dtype
-            self.length = data.shape[0]
-            self.size = self.length
-            self.update_funcs()
+            self.tail = data.shape[0]
+            self.size = self.tail
+            self.stale = True
 
     def __len__(self):
-        return self.length
+        return self.tail - self.head
 
-    def update_funcs(self):
-        """
-        Update interpolation functions
-        """
-        if self.length > 1:
-            names = tuple(self.dtype.fields.keys())
-            x_name = names[0]
-            for name in names[1:]:
-                self.add_func(name, self.data[x_name], self.data[name])
+    @property
+    def length(self):
+        return self.tail - self.head
+
+    @length.setter
+    def length(self, value):
+        with self.lock:
+            self.reserve(max(0, value - self.length))
+            self.tail = self.head + value
+            self.stale = True
 
     def add_func(self, name, x, y):
         """
@@ -464,44 +548,81 @@ class RecordArray(object):
         :param x: x-axis value
         :return: y-axis value or 0 if function does not exist
         """
+        names = self.dtype.names
+        if self.stale:
+            for column in names[1:]:
+                self.funcs.pop(column, None)
+            self.stale = False
+        if name not in self.funcs and name in names[1:] and self.length > 1:
+            data = self.data
+            self.add_func(name, data[names[0]], data[name])
+
         if name in self.funcs:
             return self.funcs[name](x)
         else:
             return 0
 
-    def resize(self):
+    def reserve(self, count):
         """
-        Increase the size of the storage by 50%
+        Make room for count more records after the tail. The storage is reallocated rather than modified in place
+        so that views of the previous storage remain valid. In ring buffer mode, only the records which will still
+        be within the buffer after adding the new ones are kept.
+
+        :param count: number of records to make room for
         """
-        self.size = int(1.5 * self.size)
-        self._data.resize((self.size,), refcheck=False)
+        if self.tail + count <= self._data.shape[0]:
+            return
+
+        if self.loop:
+            keep = max(0, min(self.length, self.size - count))
+            capacity = 2 * self.size
+        else:
+            keep = self.length
+            capacity = max(int(1.5 * self._data.shape[0]), keep + count)
+        data = numpy.empty(capacity, dtype=self.dtype)
+        data[:keep] = self._data[self.tail - keep:self.tail]
+        self._data = data
+        self.head = 0
+        self.tail = keep
 
     def append(self, rec):
         """
-        Append a tuple of values to the record array. Cycle the array around if ring buffer option is set
+        Append a tuple of values to the record array. The oldest record is dropped if the ring buffer option is set
         and the array has reached max size
+
         :param rec: sequence of values to add to array
         """
 
         with self.lock:
-            if self.length == self.size:
-                if self.loop:
-                    self._data[:-1] = self._data[1:]
-                    self.length = self.size - 1
-                else:
-                    self.resize()
-
-            self._data[self.length] = tuple(rec)
-            self.length += 1
-            self.update_funcs()
+            self.reserve(1)
+            self._data[self.tail] = tuple(rec)
+            self.tail += 1
+            if self.loop and self.tail - self.head > self.size:
+                self.head += 1
+            self.stale = True
 
     def extend(self, recs):
-        for rec in recs:
-            self.append(rec)
+        """
+        Append a block of records to the record array in one copy
+
+        :param recs: structured array or sequence of tuples of values to add to array
+        """
+        if not isinstance(recs, numpy.ndarray):
+            recs = numpy.array([tuple(rec) for rec in recs], dtype=self.dtype)
+        with self.lock:
+            if self.loop and len(recs) > self.size:
+                recs = recs[-self.size:]
+            count = len(recs)
+            self.reserve(count)
+            self._data[self.tail:self.tail + count] = recs
+            self.tail += count
+            if self.loop and self.tail - self.head > self.size:
+                self.head = self.tail - self.size
+            self.stale = True
 
     @property
     def data(self):
-        return self._data[:self.length]
+        return self._data[self.head:self.tail]
 
 
 def normalize_name(name):
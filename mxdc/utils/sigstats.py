@@ -0,0 +1,174 @@
+"""This module implements instrumentation of signal emissions for all MxDC Objects."""
+
+import json
+import os
+import threading
+import time
+
+from mxdc.utils.log import get_module_logger
+
+logger = get_module_logger(__name__)
+
+# indices of entries within the statistics records
+EMITS, DISPATCHES, LATENCY, LATENCY_MAX, HANDLER, HANDLER_MAX = range(6)
+
+SORT_KEYS = {
+    'emits': EMITS,
+    'dispatches': DISPATCHES,
+    'latency': LATENCY,
+    'handler': HANDLER,
+}
+
+
+class SignalStats(object):
+    """
+    Collects statistics about signal traffic of all :class:`mxdc.Object` instances, grouped by class and signal name.
+    For each group, it records the number of emissions, the number of handler dispatches in the main thread,
+    the latency between emission in a worker thread and dispatch in the main loop, and the execution time of the
+    handlers.
+
+    Instrumentation is disabled by default unless the `MXDC_SIGSTATS` environment variable is set. When disabled,
+    the only overhead is a check of the `enabled` flag for each emission.
+
+    .. code-block:: pycon
+
+        >>> SignalStats.enable()
+        >>> SignalStats.show(limit=10)
+        >>> SignalStats.save('/tmp/signals.json')
+
+    """
+    enabled = bool(os.environ.get('MXDC_SIGSTATS'))
+    started = time.time()
+    records = {}
+    lock = threading.Lock()
+
+    @classmethod
+    def enable(cls, reset=True):
+        """
+        Start collecting signal statistics
+
+        :param reset: if True, discard all previously collected statistics
+        """
+        if reset:
+            cls.reset()
+        cls.enabled = True
+        logger.info('Signal instrumentation enabled')
+
+    @classmethod
+    def disable(cls):
+        """
+        Stop collecting signal statistics. Previously collected statistics are preserved.
+        """
+        cls.enabled = False
+        logger.info('Signal instrumentation disabled')
+
+    @classmethod
+    def reset(cls):
+        """
+        Discard all collected statistics
+        """
+        with cls.lock:
+            cls.records = {}
+            cls.started = time.time()
+
+    @classmethod
+    def _get_record(cls, obj, signal):
+        key = (obj.__class__.__name__, signal)
+        record = cls.records.get(key)
+        if record is None:
+            record = cls.records[key] = [0, 0, 0.0, 0.0, 0.0, 0.0]
+        return record
+
+    @classmethod
+    def record_emit(cls, obj, signal):
+        """
+        Record a signal emission
+
+        :param obj: emitting object
+        :param signal: signal name
+        """
+        with cls.lock:
+            cls._get_record(obj, signal)[EMITS] += 1
+
+    @classmethod
+    def record_dispatch(cls, obj, signal, latency, duration):
+        """
+        Record the dispatch of a signal to its handlers in the main thread
+
+        :param obj: emitting object
+        :param signal: signal name
+        :param latency: time in seconds between the emission and the dispatch
+        :param duration: time in seconds taken by all handlers
+        """
+        with cls.lock:
+            record = cls._get_record(obj, signal)
+            record[DISPATCHES] += 1
+            record[LATENCY] += latency
+            record[LATENCY_MAX] = max(record[LATENCY_MAX], latency)
+            record[HANDLER] += duration
+            record[HANDLER_MAX] = max(record[HANDLER_MAX], duration)
+
+    @classmethod
+    def report(cls, key='handler', limit=None):
+        """
+        Generate a ranked report of the collected statistics.
+
+        :param key: ranking key, one of 'emits', 'dispatches', 'latency' or 'handler' (total handler time)
+        :param limit: maximum number of entries to return, all entries if None
+        :return: list of dictionaries, one per class and signal, in descending order of rank
+        """
+        index = SORT_KEYS[key]
+        with cls.lock:
+            records = sorted(cls.records.items(), key=lambda item: item[1][index], reverse=True)
+        duration = time.time() - cls.started if cls.started else 0.0
+        entries = []
+        for (class_name, signal), record in records[:limit]:
+            dispatches = max(record[DISPATCHES], 1)
+            entries.append({
+                'class': class_name,
+                'signal': signal,
+                'emits': record[EMITS],
+                'rate': record[EMITS] / duration if duration else 0.0,
+                'dispatches': record[DISPATCHES],
+                'latency_avg': record[LATENCY] / dispatches,
+                'latency_max': record[LATENCY_MAX],
+                'handler_total': record[HANDLER],
+                'handler_avg': record[HANDLER] / dispatches,
+                'handler_max': record[HANDLER_MAX],
+            })
+        return entries
+
+    @classmethod
+    def show(cls, key='handler', limit=20):
+        """
+        Print a ranked report of the collected statistics.
+
+        :param key: ranking key, see :func:`report`
+        :param limit: maximum number of entries to show
+        """
+        print(
+            f'{"Class":>24} {"Signal":>16} {"Emits":>9} {"Rate/s":>9} {"Dispatch":>9} '
+            f'{"Lat avg ms":>11} {"Lat max ms":>11} {"Hnd tot s":>10} {"Hnd max ms":>11}'
+        )
+        for entry in cls.report(key=key, limit=limit):
+            print(
+                f'{entry["class"]:>24} {entry["signal"]:>16} {entry["emits"]:9d} {entry["rate"]:9.1f} '
+                f'{entry["dispatches"]:9d} {entry["latency_avg"] * 1e3:11.3f} {entry["latency_max"] * 1e3:11.3f} '
+                f'{entry["handler_total"]:10.3f} {entry["handler_max"] * 1e3:11.3f}'
+            )
+
+    @classmethod
+    def save(cls, filename, key='handler'):
+        """
+        Save a ranked report of the collected statistics as a JSON file.
+
+        :param filename: output file name
+        :param key: ranking key, see :func:`report`
+        """
+        with open(filename, 'w') as handle:
+            json.dump({
+                'started': cls.started,
+                'saved': time.time(),
+                'signals': cls.report(key=key),
+            }, handle, indent=2)
+        logger.info(f'Signal statistics saved to {filename}')
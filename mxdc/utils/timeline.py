@@ -0,0 +1,182 @@
+"""This module implements a recorder for the start-up timeline of devices and their process variables."""
+
+import json
+import threading
+import time
+import weakref
+
+from mxdc.utils.log import get_module_logger
+
+logger = get_module_logger(__name__)
+
+
+class StartupTimeline(object):
+    """
+    Records when each device is created, when its process variables are requested and when they, and the
+    device as a whole, become active. Devices are only recorded between calls to :func:`start` and :func:`finish`,
+    and are held by weak references so that the timeline never keeps them alive. The timeline can be saved in
+    the Chrome trace event format and viewed with chrome://tracing or https://ui.perfetto.dev.
+    """
+    recording = False
+    origin = time.perf_counter()
+    # device -> {'created': t, 'requested': {key: t}, 'connected': {key: t}, 'names': {key: name}, 'active': t}
+    devices = weakref.WeakKeyDictionary()
+    cond = threading.Condition()
+
+    @staticmethod
+    def key(component):
+        """
+        Get the key under which a process variable or child device is recorded. Components are keyed by identity
+        since several children of a device may share the same name.
+
+        :param component: process variable or child device
+        """
+        return id(component)
+
+    @classmethod
+    def start(cls):
+        """
+        Discard any previous timeline and start recording
+        """
+        with cls.cond:
+            cls.devices.clear()
+            cls.origin = time.perf_counter()
+            cls.recording = True
+
+    @classmethod
+    def created(cls, device):
+        """
+        Record the creation of a device
+
+        :param device: Device instance
+        """
+        if cls.recording:
+            with cls.cond:
+                cls.devices[device] = {
+                    'created': time.perf_counter(), 'requested': {}, 'connected': {}, 'names': {}, 'active': None
+                }
+
+    @classmethod
+    def requested(cls, device, pv):
+        """
+        Record a connection request for a process variable of a device
+
+        :param device: Device instance
+        :param pv: process variable
+        """
+        if cls.recording:
+            with cls.cond:
+                entry = cls.devices.get(device)
+                if entry is not None:
+                    key = cls.key(pv)
+                    entry['requested'][key] = time.perf_counter()
+                    entry['names'][key] = getattr(pv, 'name', None) or str(pv)
+
+    @classmethod
+    def connected(cls, device, component):
+        """
+        Record that a component of a device became active for the first time
+
+        :param device: Device instance
+        :param component: process variable or child device
+        """
+        if cls.recording:
+            with cls.cond:
+                entry = cls.devices.get(device)
+                key = cls.key(component)
+                if entry is not None and key not in entry['connected']:
+                    entry['connected'][key] = time.perf_counter()
+
+    @classmethod
+    def activated(cls, device):
+        """
+        Record that all components of a device are active
+
+        :param device: Device instance
+        """
+        if cls.recording:
+            with cls.cond:
+                entry = cls.devices.get(device)
+                if entry is not None and entry['active'] is None:
+                    entry['active'] = time.perf_counter()
+                    cls.cond.notify_all()
+
+    @classmethod
+    def get_pending(cls):
+        """
+        Get all recorded devices which are not yet active
+        """
+        with cls.cond:
+            return [device for device, entry in list(cls.devices.items()) if entry['active'] is None]
+
+    @classmethod
+    def wait(cls, timeout=30.0):
+        """
+        Wait for all recorded devices to become active, with a single global timeout.
+
+        :param timeout: maximum time in seconds to wait
+        :return: list of devices which are still inactive after the wait
+        """
+        with cls.cond:
+            cls.cond.wait_for(
+                lambda: all(entry['active'] is not None for entry in list(cls.devices.values())), timeout=timeout
+            )
+        return cls.get_pending()
+
+    @classmethod
+    def finish(cls):
+        """
+        Stop recording
+        """
+        cls.recording = False
+
+    @classmethod
+    def clear(cls):
+        """
+        Discard all recorded entries. Should be called once the timeline has been reported or saved.
+        """
+        with cls.cond:
+            cls.devices.clear()
+
+    @classmethod
+    def get_events(cls):
+        """
+        Generate Chrome trace events for the recorded timeline, one track per device.
+
+        :return: list of trace event dictionaries
+        """
+
+        def usec(value):
+            return round((value - cls.origin) * 1e6)
+
+        events = []
+        now = time.perf_counter()
+        with cls.cond:
+            for i, (device, entry) in enumerate(list(cls.devices.items())):
+                name = str(device)
+                end = entry['active'] if entry['active'] is not None else now
+                events.append({'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': i, 'args': {'name': name}})
+                events.append({
+                    'name': name, 'cat': 'device', 'ph': 'X', 'pid': 1, 'tid': i,
+                    'ts': usec(entry['created']), 'dur': usec(end) - usec(entry['created']),
+                    'args': {'active': entry['active'] is not None, 'pvs': len(entry['requested'])},
+                })
+                for key, requested in entry['requested'].items():
+                    connected = entry['connected'].get(key)
+                    events.append({
+                        'name': entry['names'][key], 'cat': 'pv', 'ph': 'X', 'pid': 1, 'tid': i,
+                        'ts': usec(requested), 'dur': usec(connected if connected else now) - usec(requested),
+                        'args': {'connected': connected is not None},
+                    })
+        return events
+
+    @classmethod
+    def save(cls, filename):
+        """
+        Save the recorded timeline as a Chrome trace JSON file
+
+        :param filename: output file name
+        """
+        with open(filename, 'w') as handle:
+            json.dump({'traceEvents': cls.get_events(), 'displayTimeUnit': 'ms'}, handle)
+        logger.info(f'Start-up timeline saved to {filename}')
@@ -0,0 +1,179 @@
+"""
+This module implements a shared pool of worker threads attached to the EPICS Channel Access context, for short
+tasks, and dedicated threads for long-lived tasks such as engines.
+"""
+
+import itertools
+import queue
+import threading
+import time
+
+from concurrent.futures import Future
+
+from mxdc.com import ca
+from mxdc.utils.log import get_module_logger
+
+logger = get_module_logger(__name__)
+
+MAX_WORKERS = 64
+
+
+class WorkerPool(object):
+    """
+    A bounded pool of named daemon threads. Each worker joins the EPICS CA context once when it is started and is
+    then reused for many tasks, so that short operations do not pay for thread creation. New workers are only
+    started when no idle worker is available, up to `max_workers`. Tasks submitted when all workers are busy
+    are queued. Tasks must therefore be short, and must not block on the results of other tasks of the same pool,
+    which could wait forever once all workers are busy. Long-lived tasks should use :func:`spawn` instead.
+
+    :param name: prefix for worker thread names
+    :param max_workers: maximum number of worker threads
+    """
+
+    def __init__(self, name='Worker', max_workers=MAX_WORKERS):
+        self.name = name
+        self.max_workers = max_workers
+        self.tasks = queue.SimpleQueue()
+        self.lock = threading.Lock()
+        self.counter = itertools.count(1)
+        self.num_workers = 0
+        self.idle = 0
+        self.pending = 0
+        self.stats = {}
+        self.local = threading.local()
+
+    def submit(self, func, *args, name=None, **kwargs):
+        """
+        Schedule a function to be run by a worker thread
+
+        :param func: function or method to run
+        :param args: positional arguments for the function
+        :param name: task name used for thread names and statistics, defaults to the function name
+        :param kwargs: keyword arguments for the function
+        :return: a :class:`concurrent.futures.Future` for the result of the function
+        """
+        future = Future()
+        name = name if name else getattr(func, '__qualname__', repr(func))
+        with self.lock:
+            self.pending += 1
+            if self.idle < self.pending and self.num_workers < self.max_workers:
+                self.num_workers += 1
+                worker = threading.Thread(target=self.run, daemon=True, name=f'{self.name}-{next(self.counter)}')
+                worker.start()
+        self.tasks.put((future, func, args, kwargs, name, time.perf_counter()))
+        return future
+
+    def run(self):
+        """
+        Main loop of worker threads
+        """
+        ca.threads_init()
+        self.local.worker = True
+        thread = threading.current_thread()
+        thread_name = thread.name
+        while True:
+            with self.lock:
+                self.idle += 1
+            future, func, args, kwargs, name, queued = self.tasks.get()
+            with self.lock:
+                self.idle -= 1
+                self.pending -= 1
+
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            thread.name = f'{thread_name}: {name}'
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except BaseException as exc:
+                logger.exception(f'Task "{name}" failed: {exc}')
+                future.set_exception(exc)
+            else:
+                future.set_result(result)
+            finally:
+                self.record(name, start - queued, time.perf_counter() - start)
+                thread.name = thread_name
+
+    def is_worker(self):
+        """
+        Check if the calling thread is a worker of this pool
+        """
+        return getattr(self.local, 'worker', False)
+
+    def record(self, name, wait, duration):
+        """
+        Record task timing statistics
+
+        :param name: task name
+        :param wait: time in seconds the task spent in the queue
+        :param duration: time in seconds taken to run the task
+        """
+        with self.lock:
+            stats = self.stats.get(name)
+            if stats is None:
+                stats = self.stats[name] = {'count': 0, 'wait': 0.0, 'time': 0.0, 'max': 0.0}
+            stats['count'] += 1
+            stats['wait'] += wait
+            stats['time'] += duration
+            stats['max'] = max(stats['max'], duration)
+
+    def get_queue_depth(self):
+        """
+        Number of tasks submitted but not yet started by a worker
+        """
+        return self.pending
+
+    def get_stats(self):
+        """
+        Get a copy of the per-task timing statistics
+
+        :return: dictionary mapping task names to a dictionary of 'count', total 'wait' time, total run 'time'
+            and 'max' run time, all times in seconds.
+        """
+        with self.lock:
+            return {name: dict(stats) for name, stats in self.stats.items()}
+
+
+# Shared pool for engines, asynchronous calls and counting
+POOL = WorkerPool('MxDC')
+
+
+def submit(func, *args, **kwargs):
+    """
+    Run a function in the shared worker pool. See :func:`WorkerPool.submit`
+
+    :return: a :class:`concurrent.futures.Future` for the result of the function
+    """
+    return POOL.submit(func, *args, **kwargs)
+
+
+def spawn(func, *args, name=None, **kwargs):
+    """
+    Run a long-lived function, or one which blocks on the results of other tasks, in a dedicated daemon thread
+    attached to the EPICS CA context, rather than in the shared worker pool.
+
+    :param func: function or method to run
+    :param args: positional arguments for the function
+    :param name: thread name, defaults to the function name
+    :param kwargs: keyword arguments for the function
+    :return: a :class:`concurrent.futures.Future` for the result of the function
+    """
+    future = Future()
+    name = name if name else getattr(func, '__qualname__', repr(func))
+
+    def run():
+        ca.threads_init()
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as exc:
+            logger.exception(f'Task "{name}" failed: {exc}')
+            future.set_exception(exc)
+        else:
+            future.set_result(result)
+
+    worker = threading.Thread(target=run, daemon=True, name=name)
+    worker.start()
+    return future
@@ -2,9 +2,13 @@
 
 
 import gzip
+import hashlib
+import os
+import pickle
 import re
 import sys
 import textwrap
+import time
 from collections import namedtuple
 from collections.abc import Mapping
 from datetime import datetime, tzinfo, timedelta
@@ -13,6 +17,7 @@ from io import StringIO
 import numpy
 
 VERSION = 1.0  # Specification version
+PARTIAL_SUFFIX = '-partial'  # File name suffix of partial data files streamed during scans
 NAMESPACES = [
     'facility', 'beamline', 'mono', 'detector', 'sample', 'scan', 'element', 'column'
 ]
@@ -78,6 +83,9 @@ class OffsetTZ(tzinfo):
     def dst(self, dt):
         return timedelta(0)
 
+    def __getinitargs__(self):
+        return self.__name,
+
 
 def isotime(text):
     patt = re.compile(r'(?P<date_text>[\d-]{8,10}[T ][\d:]{6,8}(?:\.\d+)?)Z?(?:(?P<sign>[+-])(?P<offset>\d{2}:\d{2}))?')
@@ -218,6 +226,70 @@ XDI_PATTERN = re.compile(
 )
 
 HEADER_PATTERN = re.compile(r'#\s*(?P<namespace>[a-zA-Z]\w+).(?P<tag>[\w-]+):\s*(?P<text>[^\n]+)\s*')
+VERSION_PATTERN = re.compile(r'#\s*(?P<version_text>XDI/[^\n]*)')
+COMMENTS_PATTERN = re.compile(r'#\s*/{3,}$')
+SEPARATOR_PATTERN = re.compile(r'#\s*-{3,}$')
+
+BLOCK_SIZE = 10000  # number of rows formatted and written at a time
+
+
+def read_sections(handle):
+    """
+    Read the sections of an XDI file line by line, up to the data block which is read at once
+
+    :param handle: file object opened in text mode
+    :return: dictionary of text for 'version_text', 'header_text', 'comments_text', 'columns_text' and 'data_text'
+    """
+    match = VERSION_PATTERN.match(handle.readline())
+    if not match:
+        raise ValueError('Not an XDI file')
+
+    header_lines = []
+    comment_lines = None
+    for line in handle:
+        text = line.rstrip('\n')
+        if SEPARATOR_PATTERN.match(text):
+            break
+        elif comment_lines is None and COMMENTS_PATTERN.match(text):
+            comment_lines = []
+        elif comment_lines is not None:
+            comment_lines.append(line)
+        else:
+            header_lines.append(line)
+    else:
+        raise ValueError('XDI column names not found')
+
+    return {
+        'version_text': match.group('version_text'),
+        'header_text': ''.join(header_lines),
+        'comments_text': ''.join(comment_lines) if comment_lines else None,
+        'columns_text': handle.readline().lstrip('#').strip(),
+        'data_text': handle.read(),
+    }
+
+
+def read_columns(text, names):
+    """
+    Load a block of numeric data as a structured array of floats, falling back to type inference for
+    blocks containing non-numeric values.
+
+    :param text: data block
+    :param names: column names
+    :return: structured array
+    """
+    try:
+        values = numpy.loadtxt(StringIO(text), dtype=float, ndmin=2)
+    except ValueError:
+        return numpy.genfromtxt(StringIO(text), dtype=None, names=names, deletechars='')
+
+    if not values.size:
+        return numpy.empty(0, dtype=[(name, float) for name in names])
+    if values.shape[1] != len(names):
+        raise ValueError(f'Expected {len(names)} data columns, found {values.shape[1]}')
+    data = numpy.empty(values.shape[0], dtype=[(name, float) for name in names])
+    for i, name in enumerate(names):
+        data[name] = values[:, i]
+    return data
 
 
 class XDIData(object):
@@ -272,7 +344,12 @@ class XDIData(object):
                 self.header[namespace] = {}
             self.header[namespace][tag] = field
 
-    def save(self, filename):
+    def format_header(self):
+        """
+        Format the header, comments and column names
+
+        :return: header text including the final newline
+        """
         header_lines = ['# XDI/{} {}'.format(VERSION, self.version)] + [
             '{}.{}: {}'.format(
                 namespace.islower() and namespace.capitalize() or namespace, tag,
@@ -280,17 +357,35 @@ class XDIData(object):
             )
             for namespace, fields in list(self.header.items()) for tag, field in list(fields.items())
         ] + ['///'] + textwrap.wrap(self.comments) + ['---'] + [' '.join(self.data.dtype.names)]
-        data_format = ''.join(['  {}'] * len(self.data.dtype.names))
-        data_lines = [data_format.format(*row) for row in self.data]
+        return '\n# '.join(header_lines) + '\n'
+
+    def format_rows(self, rows):
+        """
+        Format rows of data. Structured arrays are formatted a column at a time, each value formatted as
+        the equivalent Python value.
+
+        :param rows: structured array or sequence of rows
+        :return: list of lines of text without newlines
+        """
+        if isinstance(rows, numpy.ndarray) and rows.dtype.names:
+            columns = [map(str, rows[name].tolist()) for name in rows.dtype.names]
+            return ['  ' + '  '.join(values) for values in zip(*columns)]
+        else:
+            data_format = ''.join(['  {}'] * len(self.data.dtype.names))
+            return [data_format.format(*row) for row in rows]
+
+    def save(self, filename):
         saver = gzip.open if filename.endswith('.gz') else open
         with saver(filename, 'wb') as handle:
-            output = '\n# '.join(header_lines) + '\n' + '\n'.join(data_lines)
-            handle.write(output.encode('utf8'))
+            handle.write(self.format_header().encode('utf8'))
+            for i in range(0, len(self.data), BLOCK_SIZE):
+                block = '\n'.join(self.format_rows(self.data[i:i + BLOCK_SIZE]))
+                handle.write((block if i == 0 else '\n' + block).encode('utf8'))
 
     def parse(self, filename, permissive=False):
         opener = gzip.open if filename.endswith('.gz') else open
-        with opener(filename, 'rb') as handle:
-            raw = XDI_PATTERN.match(handle.read().decode('utf8')).groupdict()
+        with opener(filename, 'rt', encoding='utf8') as handle:
+            raw = read_sections(handle)
         self.version = raw['version_text']
 
         self.header = {}
@@ -341,11 +436,201 @@ class XDIData(object):
             sys.stderr.write(
                 'Required fields missing: {}\n'.format([key for key, value in list(missing.items()) if value]))
 
-        self.data = numpy.genfromtxt(StringIO('{}'.format(raw['data_text'])), dtype=None, names=data_columns,
-                                     deletechars='')
+        self.data = read_columns(raw['data_text'], data_columns)
+
+
+class XDIWriter(object):
+    """
+    Streams rows of data to an uncompressed XDI file as they are collected. Rows are written as they are added
+    and the file is synchronized to disk at most every `flush_interval` seconds, so that at most that much data
+    is lost in a crash. Partially written files can be read with :func:`read_xdi`.
+
+    :param filename: output file name
+    :param xdi_data: XDIData object providing the header, its data is only used for the column names
+    :param flush_interval: maximum time in seconds between synchronizations to disk
+    """
+
+    def __init__(self, filename, xdi_data, flush_interval=5.0):
+        self.filename = filename
+        self.xdi_data = xdi_data
+        self.flush_interval = flush_interval
+        self.handle = open(filename, 'w', encoding='utf8')
+        self.handle.write(xdi_data.format_header())
+        self.flush()
+
+    def write(self, rows):
+        """
+        Append rows of data to the file
+
+        :param rows: structured array or sequence of rows
+        """
+        lines = self.xdi_data.format_rows(rows)
+        if lines:
+            self.handle.write('\n'.join(lines) + '\n')
+        if time.time() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """
+        Synchronize the file to disk
+        """
+        self.handle.flush()
+        os.fsync(self.handle.fileno())
+        self.last_flush = time.time()
+
+    def close(self):
+        """
+        Synchronize and close the file
+        """
+        if not self.handle.closed:
+            self.flush()
+            self.handle.close()
+
+
+class XDICache(object):
+    """
+    Cache of parsed XDI files in the user cache directory, keyed by the absolute path of the file, and
+    invalidated when the modification time or size of the file changes. The data is stored in numpy format and
+    memory-mapped copy-on-write when loaded, the header in a separate pickle file.
+
+    The cache directory defaults to ~/.cache/mxdc/xdi and can be changed with the `MXDC_XDI_CACHE` environment
+    variable. Entries not used for `max_age` seconds are removed, followed by the least recently used entries
+    until the cache is smaller than `max_size` bytes. Partial data files, which change while a scan is running,
+    are not cached.
+    """
+    directory = os.environ.get(
+        'MXDC_XDI_CACHE',
+        os.path.join(os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache')), 'mxdc', 'xdi')
+    )
+    max_size = 256 * 2 ** 20
+    max_age = 30 * 86400
+
+    @staticmethod
+    def is_cacheable(filename):
+        """
+        Check if a file should be cached
+
+        :param filename: XDI file name
+        :return: False for partial data files, True otherwise
+        """
+        name = os.path.basename(filename)
+        name = name[:-3] if name.endswith('.gz') else name
+        return not os.path.splitext(name)[0].endswith(PARTIAL_SUFFIX)
+
+    @classmethod
+    def get_paths(cls, filename):
+        key = hashlib.sha1(os.path.abspath(filename).encode('utf8')).hexdigest()
+        return os.path.join(cls.directory, f'{key}.npy'), os.path.join(cls.directory, f'{key}.meta')
+
+    @staticmethod
+    def get_stamp(filename):
+        info = os.stat(filename)
+        return info.st_mtime_ns, info.st_size
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Load a parsed XDI file from the cache
+
+        :param filename: XDI file name
+        :return: XDIData object or None if the file is not cached or the cache entry is out of date
+        """
+        data_file, meta_file = cls.get_paths(filename)
+        try:
+            with open(meta_file, 'rb') as handle:
+                meta = pickle.load(handle)
+            if meta['stamp'] != cls.get_stamp(filename):
+                return None
+            data = numpy.load(data_file, mmap_mode='c')
+            os.utime(meta_file)  # mark as recently used
+        except (OSError, ValueError, EOFError, KeyError, TypeError, pickle.UnpicklingError):
+            return None
+        return XDIData(header=meta['header'], data=data, comments=meta['comments'], version=meta['version'])
+
+    @classmethod
+    def save(cls, filename, xdi_data):
+        """
+        Add a parsed XDI file to the cache. Files with non-numeric data are not cached.
+
+        :param filename: XDI file name
+        :param xdi_data: XDIData object parsed from the file
+        """
+        if xdi_data.data is None or xdi_data.data.dtype.hasobject or not cls.is_cacheable(filename):
+            return
+        data_file, meta_file = cls.get_paths(filename)
+        meta = {
+            'path': os.path.abspath(filename),
+            'stamp': cls.get_stamp(filename),
+            'header': xdi_data.header,
+            'comments': xdi_data.comments,
+            'version': xdi_data.version,
+        }
+        try:
+            os.makedirs(cls.directory, exist_ok=True)
+            with open(data_file + '.tmp', 'wb') as handle:
+                numpy.save(handle, xdi_data.data, allow_pickle=False)
+            os.replace(data_file + '.tmp', data_file)
+            with open(meta_file + '.tmp', 'wb') as handle:
+                pickle.dump(meta, handle)
+            os.replace(meta_file + '.tmp', meta_file)
+        except (OSError, pickle.PicklingError) as e:
+            sys.stderr.write(f'Unable to cache {filename}: {e}\n')
+        else:
+            cls.prune()
 
+    @classmethod
+    def prune(cls):
+        """
+        Remove cache entries not used for `max_age` seconds, then the least recently used entries until the total
+        size of the cache is below `max_size` bytes. Temporary files left over by failed saves are treated as entries.
+        """
+        entries = {}
+        try:
+            names = os.listdir(cls.directory)
+        except OSError:
+            return
+        for name in names:
+            path = os.path.join(cls.directory, name)
+            key, extension = os.path.splitext(name)
+            try:
+                info = os.stat(path)
+            except OSError:
+                continue
+            if extension == '.tmp':
+                entries[path] = (info.st_mtime, info.st_size, [path])
+            elif extension in ('.npy', '.meta'):
+                used, size, paths = entries.get(key, (0, 0, []))
+                used = info.st_mtime if extension == '.meta' else used
+                entries[key] = (used, size + info.st_size, paths + [path])
+
+        expiry = time.time() - cls.max_age
+        total = sum(size for used, size, paths in entries.values())
+        for used, size, paths in sorted(entries.values()):
+            if used >= expiry and total <= cls.max_size:
+                break
+            for path in paths:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+
+
+def read_xdi(filename, cache=True):
+    """
+    Read an XDI file
 
-def read_xdi(filename):
+    :param filename: file name
+    :param cache: if True, use and update the cache of parsed files, see :class:`XDICache`. Partial data files
+        are never cached.
+    :return: XDIData object
+    """
+    if cache:
+        obj = XDICache.load(filename)
+        if obj is not None:
+            return obj
     obj = XDIData()
     obj.parse(filename)
+    if cache:
+        XDICache.save(filename, obj)
     return obj
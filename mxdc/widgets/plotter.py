@@ -1,8 +1,10 @@
 
+import time
+
 import numpy
-from gi.repository import Gtk
+from gi.repository import Gtk, GLib
 from matplotlib import cm, transforms
-from matplotlib.backends.backend_gtk3cairo import FigureCanvasGTK3Cairo as FigureCanvas
+from matplotlib.backends.backend_gtk3agg import FigureCanvasGTK3Agg as FigureCanvas
 from matplotlib.backends.backend_gtk3 import NavigationToolbar2GTK3 as NavigationToolbar
 from matplotlib.colors import Normalize
 from matplotlib.dates import MinuteLocator, SecondLocator
@@ -14,6 +16,152 @@ from mxdc.widgets import dialogs
 
 GRID_COLORMAP = 'viridis'
 GRID_INTERPOLATION = 'nearest'  # nearest
+FRAME_RATE = 20  # maximum number of frames per second drawn while adding points
+LIMITS_PAD = 0.1  # fraction of the data range left above and below lines
+LIMITS_MARGIN = 0.25  # extra fraction of the data range added when limits must grow
+
+
+def expand_limits(limits, lo, hi, pad=0.0, margin=0.0):
+    """
+    Expand axis limits to include a range of data values
+
+    :param limits: current (lower, upper) limits or None
+    :param lo: lowest data value
+    :param hi: highest data value
+    :param pad: fraction of the data range to leave beyond the data on both sides
+    :param margin: extra fraction of the data range to leave on a side which has to be expanded, so that growing
+        data does not require new limits for every point
+    :return: (lower, upper) limits, the current limits if they already include the data
+    """
+    span = hi - lo
+    if span <= 0:
+        return limits
+    elif limits is None:
+        return lo - pad * span, hi + pad * span
+
+    lower, upper = limits
+    if lo < lower:
+        lower = lo - (pad + margin) * span
+    if hi > upper:
+        upper = hi + (pad + margin) * span
+    return lower, upper
+
+
+class GridModel(object):
+    """
+    Counts of a grid scan in a preallocated 2D array. Each point is written directly into its cell, found from its
+    positions and the grid step sizes. If the number of columns is not known in advance, as for slew grid scans,
+    points are placed in each row in the order they arrive, reversing alternate rows of snake grids, and the number
+    of columns is set from the first row. Rows beyond the initial shape are added as needed for extended scans.
+
+    :param shape: (rows, columns) of the grid, columns can be None if not known in advance
+    :param extent: (x1, x2, y1, y2) positions of the first and last columns and rows
+    :param snake: whether alternate rows are scanned in reverse
+    """
+
+    def __init__(self, shape, extent, snake=False):
+        self.rows, self.columns = shape
+        self.extent_specs = extent
+        self.snake = snake
+        self.positional = self.columns is not None
+        self.x_step = self.get_step(extent[0], extent[1], self.columns)
+        self.y_step = self.get_step(extent[2], extent[3], self.rows)
+        self.counts = None
+        self.pending = []  # points received before the number of columns is known
+        self.row = None
+        self.index = 0  # index of next point in the row when the number of columns was not known
+        self.vmin = self.vmax = None
+        if self.positional:
+            self.allocate()
+
+    @staticmethod
+    def get_step(first, last, count):
+        if count and count > 1 and last != first:
+            return (last - first) / (count - 1)
+        return 1.0
+
+    def allocate(self):
+        self.counts = numpy.full((max(self.rows, 1), self.columns), numpy.nan)
+
+    def set_columns(self, columns):
+        """
+        Set the number of columns once known and place all points received so far
+
+        :param columns: number of columns
+        """
+        if self.counts is None and columns > 0:
+            self.columns = columns
+            self.x_step = self.get_step(self.extent_specs[0], self.extent_specs[1], columns)
+            self.allocate()
+            pending, self.pending = self.pending, []
+            for point in pending:
+                self.add(*point)
+
+    def get_cell(self, x, y):
+        """
+        Find the cell for a point
+
+        :param x: inner motor position
+        :param y: outer motor position
+        :return: (row, column) tuple
+        """
+        row = int(round((y - self.extent_specs[2]) / self.y_step))
+        if self.positional:
+            col = int(round((x - self.extent_specs[0]) / self.x_step))
+        else:
+            if row != self.row:
+                self.row, self.index = row, 0
+            col = self.index
+            self.index += 1
+            if self.snake and row % 2:
+                col = self.columns - 1 - col
+        return row, col
+
+    def add(self, x, y, value):
+        """
+        Write a point into its cell and update the value range
+
+        :param x: inner motor position
+        :param y: outer motor position
+        :param value: counts
+        :return: True if the grid gained rows
+        """
+        if self.counts is None:
+            self.pending.append((x, y, value))
+            return False
+
+        row, col = self.get_cell(x, y)
+        if row < 0 or not 0 <= col < self.columns:
+            return False
+
+        resized = row >= self.rows
+        if row >= self.counts.shape[0]:
+            counts = numpy.full((max(row + 1, 2 * self.counts.shape[0]), self.columns), numpy.nan)
+            counts[:self.rows] = self.counts[:self.rows]
+            self.counts = counts
+        self.rows = max(self.rows, row + 1)
+        self.counts[row, col] = value
+
+        if value == value:  # skip nan
+            self.vmin = value if self.vmin is None else min(self.vmin, value)
+            self.vmax = value if self.vmax is None else max(self.vmax, value)
+        return resized
+
+    def get_counts(self):
+        """
+        Return the 2D array of counts, with nan for cells without values, or None if the grid is not allocated yet
+        """
+        return None if self.counts is None else self.counts[:self.rows]
+
+    def get_extent(self):
+        """
+        Return the extent of the grid image (left, right, bottom, top) including the full area of the edge cells
+        """
+        x1, y1 = self.extent_specs[0], self.extent_specs[2]
+        return [
+            x1 - self.x_step / 2, x1 + (self.columns - 0.5) * self.x_step,
+            y1 - self.y_step / 2, y1 + (self.rows - 0.5) * self.y_step,
+        ]
 
 
 class PlotterToolbar(NavigationToolbar):
@@ -59,16 +207,25 @@ class Plotter(Gtk.Box):
         self.values = None
 
         self.grid_mode = False
-        self.grid_specs = {}
+        self.grid = None
         self.grid_image = None
         self.grid_norm = Normalize()
-        self.grid_snake = False
+        self.unordered = False
+
+        self.columns = {}
+        self.extrema = {}
+        self.limits = {}
+        self.background = None
+        self.frame_pending = False
+        self.last_frame = 0.0
 
         self.fig = Figure(dpi=dpi)
         self.clear()
 
         self.canvas = FigureCanvas(self.fig)  # a Gtk.DrawingArea
+        self.blit = getattr(self.canvas, 'supports_blit', False)
         self.canvas.mpl_connect('motion_notify_event', self.on_mouse_motion)
+        self.canvas.mpl_connect('draw_event', self.on_draw)
         self.toolbar = PlotterToolbar(self.canvas, dialogs.MAIN_WINDOW)
 
         self.pack_start(self.canvas, True, True, 0)
@@ -85,14 +242,19 @@ class Plotter(Gtk.Box):
         self.fig.subplots_adjust(bottom=0.1, left=0.05, top=0.90, right=self.axis_space)
         specs = {} if specs is None else specs
         self.grid_mode = 'grid' in specs.get('scan_type', '')
+        self.unordered = specs.get('unordered', False)
         self.data_type = specs.get('data_type')
         self.values = misc.RecordArray(self.data_type, size=self.buffer_size, loop=self.ring_buffer)
         self.cursor_line = None
         self.lines = {}
-        self.grid_snake = specs.get('grid_snake', False)
-        self.grid_specs = {}
+        self.grid = None
+        if self.grid_mode:
+            self.grid = GridModel(specs['grid_shape'], specs['grid_extent'], snake=specs.get('grid_snake', False))
         self.grid_image = None
         self.grid_norm = Normalize()
+        self.extrema = {}
+        self.limits = {}
+        self.background = None
 
         ax = self.fig.add_subplot()
         ax.yaxis.tick_right()
@@ -100,6 +262,7 @@ class Plotter(Gtk.Box):
         self.axis = {'default': ax}
 
         if specs:
+            self.columns = {name: i for i, name in enumerate(self.data_type['names'])}
             names = self.data_type['names'][1:]
             scales = specs.get('data_scale')
             if scales:
@@ -201,7 +364,8 @@ class Plotter(Gtk.Box):
 
     def add_point(self, row, redraw=True):
         """
-        Add a row of scan points to the data table
+        Add a row of scan points to the data table. Only the running extrema of the data are updated for each point,
+        the plot is redrawn at most FRAME_RATE times per second.
 
         :param row: sequence of values to add
         :param redraw: Whether to redraw the plot
@@ -214,47 +378,134 @@ class Plotter(Gtk.Box):
         x_name = self.data_type['names'][0]
         if self.grid_mode:
             # no lines for grid mode
-            self.update_grid_data()
-        elif not self.lines:
-            count = 0
-            for axis, lines in self.plot_scales.items():
-                if axis != 'default':
-                    self.add_axis(name=axis)
-                for line in lines:
-                    self.add_line(
-                        self.values.data[x_name], self.values.data[line], color=self.colormap(count),
-                        name=line, axis=axis, markevery=[-1]
-                    )
-                    count += 1
+            self.add_grid_point(row)
         else:
-            xmin, xmax = misc.get_min_max(self.values.data[x_name], ldev=0, rdev=0)
-            for axis, lines in self.plot_scales.items():
-                ymin = ymax = None
-                ax = None
-                for name in lines:
-                    line = self.lines[name]
-                    line.set_data(self.values.data[x_name], self.values.data[name])
-                    ax = line.axes
-                    ylo, yhi = misc.get_min_max(self.values.data[name], ldev=0.5, rdev=0.5)
-                    if ymin is None:
-                        ymin, ymax = ylo, yhi
-                    else:
-                        ymin, ymax = min(ymin, ylo), max(ymax, yhi)
-                        ymin, ymax = ymin, ymax
-
-                # adjust axes limits as necessary
-                if ax is not None and xmin != xmax and ymin != ymax:
-                    offset = (ymax - ymin) * .1
-                    ax.set_ylim(ymin - offset, ymax + offset)
-                    ax.set_xlim(xmin, xmax)
-
-            if len(self.lines) > 1:
-                default = self.axis.get('default')
-                xmin_current, xmax_current = default.get_xlim()
-                default.set_xlim(min(xmin, xmin_current), max(xmax, xmax_current))
+            if not self.lines:
+                count = 0
+                for axis, lines in self.plot_scales.items():
+                    if axis != 'default':
+                        self.add_axis(name=axis)
+                    for line in lines:
+                        self.add_line(
+                            self.values.data[x_name], self.values.data[line], color=self.colormap(count),
+                            name=line, axis=axis, markevery=[-1]
+                        )
+                        self.lines[line].set_animated(self.blit)
+                        count += 1
+            self.update_extrema(row)
 
         if redraw:
+            self.queue_frame()
+
+    def add_points(self, rows, redraw=True):
+        """
+        Add several rows of scan points to the data table, redrawing only once
+
+        :param rows: structured array or sequence of rows
+        :param redraw: Whether to redraw the plot
+        """
+        rows = rows.tolist() if isinstance(rows, numpy.ndarray) else rows
+        for row in rows:
+            if not numpy.isnan(row).any():
+                self.add_point(row, redraw=False)
+        if redraw:
+            self.queue_frame()
+
+    def update_extrema(self, row):
+        """
+        Update the running extrema of the x-axis and of each axis with a new row of data
+
+        :param row: sequence of values
+        """
+        values = [('x', row[0])] + [
+            (axis, row[self.columns[name]]) for axis, lines in self.plot_scales.items() for name in lines
+        ]
+        for key, value in values:
+            if value == value:  # skip nan
+                lo, hi = self.extrema.get(key, (value, value))
+                self.extrema[key] = (min(lo, value), max(hi, value))
+
+    def reset_extrema(self):
+        """
+        Recalculate the extrema from all the data currently in the table
+        """
+        data = self.values.data
+        x_name = self.data_type['names'][0]
+        self.extrema = {}
+        for key, names in [('x', (x_name,))] + list(self.plot_scales.items()):
+            if names:
+                values = numpy.concatenate([data[name] for name in names]).astype(float)
+                values = values[numpy.isfinite(values)]
+                if len(values):
+                    self.extrema[key] = (values.min(), values.max())
+
+    def update_limits(self):
+        """
+        Expand the axis limits to include the extrema of the data. In ring-buffer mode, the limits follow the data
+        exactly instead.
+
+        :return: True if any limits changed
+        """
+        changed = False
+        for key, (lo, hi) in self.extrema.items():
+            if key != 'x' and key not in self.axis:
+                continue
+            pad = 0.0 if key == 'x' else LIMITS_PAD
+            if self.ring_buffer:
+                limits = expand_limits(None, lo, hi, pad=pad)
+            else:
+                limits = expand_limits(self.limits.get(key), lo, hi, pad=pad, margin=LIMITS_MARGIN)
+            if limits is not None and limits != self.limits.get(key):
+                self.limits[key] = limits
+                changed = True
+                if key == 'x':
+                    self.axis['default'].set_xlim(*limits)
+                else:
+                    self.axis[key].set_ylim(*limits)
+        return changed
+
+    def queue_frame(self):
+        """
+        Draw a new frame as soon as allowed by the frame rate
+        """
+        if not self.frame_pending:
+            self.frame_pending = True
+            delay = max(0.0, self.last_frame + 1.0 / FRAME_RATE - time.time())
+            GLib.timeout_add(int(delay * 1000), self.draw_frame)
+
+    def draw_frame(self):
+        """
+        Update the scan lines with the current data. Only the lines are redrawn over the saved background if the
+        canvas supports blitting and the axis limits have not changed, otherwise the whole figure is redrawn.
+        Data of scans which do not record points in order of position is sorted by position before drawing.
+        """
+        self.frame_pending = False
+        self.last_frame = time.time()
+        if self.grid_mode:
+            self.draw_grid()
+            return False
+        elif not self.lines:
             self.redraw()
+            return False
+
+        data = self.values.data
+        x_name = self.data_type['names'][0]
+        if self.unordered:
+            data = numpy.sort(data, order=x_name)
+        names = [name for scale in self.plot_scales.values() for name in scale if name in self.lines]
+        for name in names:
+            self.lines[name].set_data(data[x_name], data[name])
+
+        if self.ring_buffer:
+            self.reset_extrema()
+        if self.update_limits() or self.background is None:
+            self.redraw()
+        else:
+            self.canvas.restore_region(self.background)
+            for name in names:
+                self.lines[name].axes.draw_artist(self.lines[name])
+            self.canvas.blit(self.fig.bbox)
+        return False
 
     def new_row(self, index):
         """
@@ -262,75 +513,55 @@ class Plotter(Gtk.Box):
         :param index: row index for next row
         """
 
-        if self.grid_mode and index > 1:
-            # for slew grid scans, data needs to be padded/truncated
+        if self.grid_mode and index == 1 and self.grid.columns is None:
+            # for slew grid scans, the number of columns is the number of points in the first row
             y_name = self.data_type['names'][1]
             yo = self.values.data[y_name]
+            self.grid.set_columns((yo == yo[0]).sum())
+            self.queue_frame()
 
-            x_size = (yo == yo[0]).sum()
-            y_size = index
-            pad = x_size * y_size - yo.shape[0]
-            if pad == 0:
-                return
-            elif pad > 0:
-                for i in range(pad):
-                    self.values.append(self.values.data[-1])  # padding
-            elif pad < 0:
-                self.values.length = x_size * y_size
-            self.update_grid_data()
-
-    def update_grid_data(self):
-        """
-        Update the grid image values
-        """
-        x_name, y_name, counts_name = self.data_type['names'][:3]
-        xo = self.values.data[x_name]
-        yo = self.values.data[y_name]
-        counts = self.values.data[counts_name]
-
-        x_min, x_max = xo.min(), xo.max()
-        y_min, y_max = yo.min(), yo.max()
-
-        self.grid_norm.autoscale(counts)
-
-        xsize = (yo == yo[0]).sum()
-        ysize = int(numpy.ceil(yo.shape[0] / xsize))
-
-        # pad unfilled values with nan
-        blanks = xsize * ysize - counts.shape[0]
-        if blanks:
-            counts = numpy.pad(counts, (0, blanks), 'constant', constant_values=(numpy.nan, numpy.nan))
-
-        count_data = numpy.resize(counts, (ysize, xsize))
-
-        # flip alternate rows
-        if self.grid_snake:
-            count_data[1::2, :] = count_data[1::2, ::-1]
-
-        self.grid_specs.update({
-            'x': xo,
-            'y': yo,
-            'counts': count_data,
-        })
-        extent = [
-            x_min, x_max,
-            y_min, y_max,
-        ]
+    def add_grid_point(self, row):
+        """
+        Write a new point into the grid image and update the color scale
+
+        :param row: sequence of values, inner and outer motor positions followed by the counts
+        """
+        self.grid.add(row[0], row[1], row[2])
+        if self.grid.vmin is not None:
+            self.grid_norm.vmin, self.grid_norm.vmax = self.grid.vmin, self.grid.vmax
+
+    def draw_grid(self):
+        """
+        Update the grid image with the current counts. Only the image is redrawn over the saved background if the
+        canvas supports blitting and the extent of the grid has not changed, otherwise the whole figure is redrawn.
+        """
+        counts = self.grid.get_counts()
+        if counts is None:
+            return
+
+        extent = self.grid.get_extent()
         if self.grid_image is None:
             default = self.axis.get('default')
             self.grid_image = default.imshow(
-                self.grid_specs['counts'], cmap=cm.get_cmap(GRID_COLORMAP), origin='lower',
+                counts, cmap=cm.get_cmap(GRID_COLORMAP), origin='lower',
                 norm=self.grid_norm, extent=extent, aspect='auto',
                 interpolation=GRID_INTERPOLATION,
             )
         else:
-            self.grid_image.set_data(self.grid_specs['counts'])
-            self.grid_image.set_extent(extent)
+            self.grid_image.set_data(counts)
 
-        # set axis limits
-        self.grid_image.axes.set_xlim(extent[:2])
-        self.grid_image.axes.set_ylim(extent[-2:])
-        self.redraw()
+        if extent != self.limits.get('grid'):
+            self.limits['grid'] = extent
+            self.grid_image.set_extent(extent)
+            self.grid_image.axes.set_xlim(extent[:2])
+            self.grid_image.axes.set_ylim(extent[-2:])
+            self.redraw()
+        elif self.background is None:
+            self.redraw()
+        else:
+            self.canvas.restore_region(self.background)
+            self.grid_image.axes.draw_artist(self.grid_image)
+            self.canvas.blit(self.fig.bbox)
 
     def get_records(self):
         """
@@ -353,6 +584,7 @@ class Plotter(Gtk.Box):
         default.set_xticklabels([d != ' ' and d.strftime(fmt) or '' for d in labels])
 
     def redraw(self):
+        self.background = None
         if not self.grid_mode:
             lines = list(self.lines.values())
             labels = list(self.lines.keys())
@@ -362,6 +594,16 @@ class Plotter(Gtk.Box):
             )
         self.canvas.draw_idle()
 
+    def on_draw(self, event):
+        """
+        Save the background of the figure after every full draw for blitting, and draw the animated lines over it
+        """
+        if self.blit:
+            self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+            for line in self.lines.values():
+                if line.get_animated():
+                    line.axes.draw_artist(line)
+
     def on_mouse_motion(self, event):
         default = self.axis.get('default')
 
@@ -30,6 +30,211 @@ COLORS = [
     '#17becf'
 ]
 
+DECIMATION = 4  # number of samples combined into each sample of the next resolution level
+MIN_LEVEL_SIZE = 512  # no further resolution levels are added below this size
+MIN_POINTS = 200  # minimum number of points drawn per line
+
+
+class HistoryLevel(object):
+    """
+    Ring buffer of the minimum and maximum values of all series at one resolution level
+
+    :param size: number of samples
+    :param columns: number of series
+    """
+
+    def __init__(self, size, columns):
+        self.size = size
+        self.index = 0
+        self.count = 0
+        self.low = numpy.full((size, columns), numpy.nan)
+        self.high = numpy.full((size, columns), numpy.nan)
+
+    def add_column(self):
+        self.low = numpy.column_stack([self.low, numpy.full(self.size, numpy.nan)])
+        self.high = numpy.column_stack([self.high, numpy.full(self.size, numpy.nan)])
+
+    def clear(self):
+        self.index = 0
+        self.count = 0
+
+    def push(self, low, high):
+        """
+        Add a sample, replacing the oldest one once the buffer is full
+
+        :param low: minimum values of all series
+        :param high: maximum values of all series
+        """
+        self.low[self.index] = low
+        self.high[self.index] = high
+        self.index = (self.index + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+    def get_segments(self):
+        """
+        Return the slices of the buffer holding samples, oldest first
+        """
+        if self.count < self.size:
+            return [slice(0, self.index)]
+        else:
+            return [slice(self.index, self.size), slice(0, self.index)]
+
+    def get_range(self, start, end):
+        """
+        Return the samples overlapping a time range in chronological order. The first column holds the time.
+
+        :param start: start time
+        :param end: end time
+        :return: (low, high) arrays
+        """
+        lows, highs = [], []
+        for segment in self.get_segments():
+            low, high = self.low[segment], self.high[segment]
+            first = numpy.searchsorted(high[:, 0], start, side='left')
+            last = numpy.searchsorted(low[:, 0], end, side='right')
+            lows.append(low[first:last])
+            highs.append(high[first:last])
+        return numpy.concatenate(lows), numpy.concatenate(highs)
+
+
+class TickerHistory(object):
+    """
+    History of ticker samples in a ring buffer, together with copies at decreasing resolutions, each combining
+    DECIMATION samples of the previous one into their minimum and maximum, down to about MIN_LEVEL_SIZE samples.
+    Adding a sample is O(levels) and views are extracted from the coarsest level which still has about as many
+    samples as points requested, so the cost of drawing does not depend on the length of the history.
+
+    :param size: number of samples to keep
+    :param factor: number of samples combined into each sample of the next level
+    """
+
+    def __init__(self, size, factor=DECIMATION):
+        self.lock = threading.Lock()
+        self.factor = factor
+        self.names = ['time']
+        sizes = [size]
+        while sizes[-1] > MIN_LEVEL_SIZE:
+            sizes.append(int(numpy.ceil(sizes[-1] / factor)))
+        self.levels = [HistoryLevel(level_size, 1) for level_size in sizes]
+
+        # partially combined samples of each level above the first
+        self.pending_count = [0] * len(self.levels)
+        self.pending_low = numpy.full((len(self.levels), 1), numpy.nan)
+        self.pending_high = numpy.full((len(self.levels), 1), numpy.nan)
+
+    def add_series(self, name):
+        """
+        Add a named series, with no values for samples already in the history
+
+        :param name: series name
+        """
+        with self.lock:
+            if name in self.names:
+                return
+            self.names.append(name)
+            for level in self.levels:
+                level.add_column()
+            self.pending_low = numpy.column_stack([self.pending_low, numpy.full(len(self.levels), numpy.nan)])
+            self.pending_high = numpy.column_stack([self.pending_high, numpy.full(len(self.levels), numpy.nan)])
+
+    def add(self, timestamp, values):
+        """
+        Add a sample to the history. The sample is assembled under the lock so that it always matches the
+        current series.
+
+        :param timestamp: time of the sample
+        :param values: dictionary mapping series names to values, missing series are recorded as nan
+        """
+        with self.lock:
+            sample = numpy.array([timestamp] + [values.get(name, numpy.nan) for name in self.names[1:]], dtype=float)
+            low = high = sample
+            self.levels[0].push(low, high)
+            for i in range(1, len(self.levels)):
+                if self.pending_count[i] == 0:
+                    self.pending_low[i] = low
+                    self.pending_high[i] = high
+                else:
+                    numpy.fmin(self.pending_low[i], low, out=self.pending_low[i])
+                    numpy.fmax(self.pending_high[i], high, out=self.pending_high[i])
+                self.pending_count[i] += 1
+                if self.pending_count[i] < self.factor:
+                    break
+                low, high = self.pending_low[i], self.pending_high[i]
+                self.levels[i].push(low, high)
+                self.pending_count[i] = 0
+
+    def clear(self):
+        """
+        Remove all samples
+        """
+        with self.lock:
+            for level in self.levels:
+                level.clear()
+            self.pending_count = [0] * len(self.levels)
+
+    def count(self, start, end):
+        """
+        Count the samples within a time range at full resolution
+
+        :param start: start time
+        :param end: end time
+        """
+        level = self.levels[0]
+        total = 0
+        for segment in level.get_segments():
+            times = level.low[segment, 0]
+            total += numpy.searchsorted(times, end, side='right') - numpy.searchsorted(times, start, side='left')
+        return total
+
+    def get_data(self, start, end, points):
+        """
+        Get the values of all series within a time range, reduced to about the given number of points. Decimated
+        samples are returned as consecutive minimum and maximum points so that the envelope of the data is kept.
+
+        :param start: start time
+        :param end: end time
+        :param points: maximum number of points
+        :return: dictionary mapping series names to arrays, including 'time'
+        """
+        with self.lock:
+            count = self.count(start, end)
+            index = 0
+            if count > points:
+                buckets = max(points // 2, 1)
+                while index < len(self.levels) - 1 and count / self.factor ** index > buckets:
+                    index += 1
+
+            low, high = self.levels[index].get_range(start, end)
+            if index > 0:
+                # include the newest samples not yet combined into the level
+                pending = [i for i in range(1, index + 1) if self.pending_count[i]]
+                if pending:
+                    low = numpy.vstack([low, numpy.fmin.reduce(self.pending_low[pending], axis=0)])
+                    high = numpy.vstack([high, numpy.fmax.reduce(self.pending_high[pending], axis=0)])
+                values = numpy.empty((2 * len(low), len(self.names)))
+                values[0::2] = low
+                values[1::2] = high
+            else:
+                values = low
+        return {name: values[:, i] for i, name in enumerate(self.names)}
+
+    def save(self, filename):
+        """
+        Save the full resolution history to a comma separated text file, one sample per line, oldest first
+
+        :param filename: file name
+        """
+        with self.lock:
+            level = self.levels[0]
+            blocks = [level.low[segment].copy() for segment in level.get_segments()]
+            names = list(self.names)
+
+        formats = ['%.3f'] + ['%.6g'] * (len(names) - 1)
+        with open(filename, 'w') as handle:
+            handle.write(','.join(names) + '\n')
+            for block in blocks:
+                numpy.savetxt(handle, block, fmt=formats, delimiter=',')
+
 
 class TickerChart(Gtk.Box):
     __gsignals__ = {
@@ -42,7 +247,6 @@ class TickerChart(Gtk.Box):
         self.canvas = FigureCanvas(self.fig)
         self.pack_start(self.canvas, True, True, 0)
 
-        self.data = {}
         self.plots = {}
         self.info = {}
         self.alternates = set()
@@ -64,7 +268,7 @@ class TickerChart(Gtk.Box):
         self.deviation = 20
 
         self.view_time = time.time()
-        self.add_data('time')
+        self.history = TickerHistory(self.keep_size)
         self.paused = False
         self.show_all()
 
@@ -91,18 +295,7 @@ class TickerChart(Gtk.Box):
         self.update()
 
     def add_data(self, name):
-        if name in self.data:
-            return
-        self.data[name] = numpy.empty(self.keep_size)
-        self.data[name][:] = numpy.nan
-
-    def resize_data(self):
-        for name, data in list(self.data.items()):
-            self.data[name] = numpy.empty(self.keep_size)
-            if self.max_samples > len(data):
-                self.data[name][-len(data):] = data
-            else:
-                self.data[name] = data[-self.keep_size:]
+        self.history.add_series(name)
 
     def select_active(self, name):
         if name in self.alternates:
@@ -112,9 +305,14 @@ class TickerChart(Gtk.Box):
     def add_alternate(self, name):
         self.alternates.add(name)
 
-    def shift_data(self):
-        for name, data in list(self.data.items()):
-            data[:-1] = data[1:]
+    def add_sample(self, timestamp, values):
+        """
+        Add a sample of all series to the history
+
+        :param timestamp: time of the sample
+        :param values: dictionary mapping series names to values, missing series are recorded as nan
+        """
+        self.history.add(timestamp, values)
 
     def add_plot(self, name, color=None, linestyle='-', axis=0, alternate=False):
         assert axis in [0, 1], 'axis must be 0 or 1'
@@ -132,22 +330,17 @@ class TickerChart(Gtk.Box):
         self.add_data(name)
 
     def clear(self):
-        for name, line in list(self.plots.items()):
-            self.data[name][:] = numpy.nan
+        self.history.clear()
 
     def update(self):
         if self.paused:
             return
-        selector = ~numpy.isnan(self.data['time'])
-        selector[selector] = (
-            (self.data['time'][selector] > (self.view_time - self.view_range))
-            & (self.data['time'][selector] <= self.view_time)
-        )
-
-        if selector.sum() < 2:
+        points = max(int(self.fig.bbox.width), MIN_POINTS)
+        data = self.history.get_data(self.view_time - self.view_range, self.view_time, points)
+        if len(data['time']) < 2:
             return
-        now = self.data['time'][selector][-1]
-        x_data = self.data['time'][selector] - now
+        now = data['time'][-1]
+        x_data = data['time'] - now
         xmin, xmax = min(x_data.min(), -self.view_range), x_data.max()
 
         extrema = defaultdict(lambda: (numpy.nan, numpy.nan))
@@ -156,7 +349,7 @@ class TickerChart(Gtk.Box):
             if name in self.alternates and name != self.active: continue
             axis = self.info[name]['axis']
             ymin, ymax = extrema[axis]
-            y_data = self.data[name][selector]
+            y_data = data[name]
             mn, mx = misc.get_min_max(y_data, ldev=self.deviation, rdev=self.deviation)
             ymin, ymax = numpy.nanmin([ymin, mn]), numpy.nanmax([ymax, mx])
             extrema[axis] = (ymin, ymax)
@@ -176,6 +369,9 @@ class TickerChart(Gtk.Box):
         return list(self.plots.values())
 
     def save(self):
+        """
+        Save the chart as an image, or the full history of the data if the file name ends with '.csv'
+        """
         dialog = Gtk.FileChooserDialog(
             "Save Chart ...", dialogs.MAIN_WINDOW, Gtk.FileChooserAction.SAVE,
             (Gtk.STOCK_CANCEL, Gtk.ResponseType.CANCEL, Gtk.STOCK_SAVE, Gtk.ResponseType.OK)
@@ -185,7 +381,10 @@ class TickerChart(Gtk.Box):
         if response == Gtk.ResponseType.OK:
             img_filename = dialog.get_filename()
             if os.access(os.path.dirname(img_filename), os.W_OK):
-                self.fig.savefig(img_filename)
+                if img_filename.lower().endswith('.csv'):
+                    self.history.save(img_filename)
+                else:
+                    self.fig.savefig(img_filename)
         dialog.destroy()
 
 
@@ -243,15 +442,11 @@ class ChartManager(GObject.GObject):
         return self.chart.paused
 
     def update_data(self):
-        # update the values of the array every interval seconds, shift left
+        # add a sample of all values to the history every interval seconds
         while not self._stopped:
-            self.chart.shift_data()
-            if not self.is_paused():
-                for name, value in list(self.values.items()):
-                    if name in self.chart.data:
-                        self.chart.data[name][-1] = value
-            self.chart.data['time'][-1] = time.time()
-            self.chart.view_time = time.time()
+            now = time.time()
+            self.chart.add_sample(now, {} if self.is_paused() else self.values)
+            self.chart.view_time = now
             time.sleep(self.interval)
 
     def cleanup(self):
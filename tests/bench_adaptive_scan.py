@@ -0,0 +1,70 @@
+"""
+Benchmark of adaptive versus uniform step scans.
+
+Scans a simulated motor over a narrow peak on a flat background with a uniform AbsScan and with an AdaptiveScan
+using the same finest step size. Reports the number of points, the time to result, and the errors of the peak
+position and width estimated with histogram_fit, relative to the true profile.
+
+Usage: python tests/bench_adaptive_scan.py [exposure]
+"""
+
+import os
+import sys
+import time
+
+import numpy
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mxdc.devices.counter import SimCounter
+from mxdc.devices.motor import SimMotor
+from mxdc.engines.scanning import AbsScan, AdaptiveScan
+from mxdc.utils import fitting
+
+PEAK_POSITION = 1.3
+PEAK_FWHM = 0.4
+SCAN_RANGE = (-10.0, 10.0)
+
+
+class ProfileCounter(SimCounter):
+    """
+    Simulated counter with a Gaussian profile as a function of the motor position
+    """
+
+    def __init__(self, name, motor):
+        super().__init__(name)
+        self.motor = motor
+
+    def fetch_value(self):
+        sigma = PEAK_FWHM / 2.3548
+        x = self.motor.get_position()
+        return 100.0 + 1e4 * numpy.exp(-0.5 * ((x - PEAK_POSITION) / sigma) ** 2)
+
+
+def run(scan):
+    start = time.perf_counter()
+    scan.run()
+    elapsed = time.perf_counter() - start
+    x = scan.data[scan.data.dtype.names[0]].astype(float)
+    y = scan.data[scan.data.dtype.names[1]].astype(float)
+    (ymax, fwhm, xpeak, left, right, cema), success = fitting.histogram_fit(x, y)
+    return len(scan.data), elapsed, abs(xpeak - PEAK_POSITION), abs(fwhm - PEAK_FWHM)
+
+
+if __name__ == '__main__':
+    exposure = float(sys.argv[1]) if len(sys.argv) > 1 else 0.01
+    motor = SimMotor('sim_motor', pos=0.0, speed=100.0)
+    counter = ProfileCounter('sim_counter', motor)
+    step = PEAK_FWHM / 10
+    uniform_points = int(round((SCAN_RANGE[1] - SCAN_RANGE[0]) / step)) + 1
+
+    results = {
+        'Uniform': run(AbsScan(motor, *SCAN_RANGE, uniform_points, exposure, counter)),
+        'Adaptive': run(AdaptiveScan(
+            motor, *SCAN_RANGE, exposure, counter, coarse=41, max_points=uniform_points, min_step=step / 2,
+            criterion='peak'
+        )),
+    }
+    print(f'{"Scan":>10} {"Points":>8} {"Time (s)":>10} {"Peak err":>10} {"FWHM err":>10}')
+    for name, (points, elapsed, peak_error, fwhm_error) in results.items():
+        print(f'{name:>10} {points:8d} {elapsed:10.2f} {peak_error:10.4f} {fwhm_error:10.4f}')
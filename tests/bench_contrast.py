@@ -0,0 +1,79 @@
+"""
+Benchmark of contrast estimation for displayed frames.
+
+Builds a simulated 16-Mpixel Eiger frame with a Poisson background, Bragg spots and module gaps marked with the
+saturated value, and compares the percentiles used for the display contrast from the strided subsample of the
+first quadrant against those from the full quadrant as previously used. Reports the relative errors of the
+minimum and maximum and the cost per frame of each method, and of a frame of an already displayed dataset.
+The number of spots and the mean background can be lowered to check sparse or weak frames.
+
+Usage: python tests/bench_contrast.py [stride] [spots] [background]
+"""
+
+import os
+import sys
+import time
+
+import numpy
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mxdc.utils import images
+
+FRAME_SHAPE = (4362, 4148)
+CUTOFF = 2 ** 32 - 1
+REPEATS = 10
+
+
+def make_frame(shape, spots=5000, background=5.0):
+    data = numpy.random.poisson(background, shape).astype(numpy.uint32)
+    positions = numpy.random.randint(0, min(shape) - 3, (spots, 2))
+    for y, x in positions:
+        data[y:y + 3, x:x + 3] += numpy.random.randint(50, 50000, dtype=numpy.uint32)
+    data[::514, :] = CUTOFF
+    data[:, ::1040] = CUTOFF
+    return data
+
+
+def legacy_percentiles(data):
+    w, h = data.shape
+    sub_data = data[:h // 2, :w // 2]
+    selected = (sub_data >= 0) & (sub_data < CUTOFF)
+    stats_data = sub_data if not selected.sum() else sub_data[selected]
+    return numpy.percentile(stats_data, images.MIN_MAX_PERCENTILES)
+
+
+def sampled_percentiles(data, stride):
+    return numpy.percentile(images.get_stats_data(data, CUTOFF, stride=stride), images.MIN_MAX_PERCENTILES)
+
+
+def cached_percentiles(identifier):
+    return images.ContrastCache.get(identifier)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    for i in range(REPEATS):
+        result = func(*args)
+    return (time.perf_counter() - start) / REPEATS, result
+
+
+if __name__ == '__main__':
+    stride = int(sys.argv[1]) if len(sys.argv) > 1 else images.STATS_STRIDE
+    spots = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    background = float(sys.argv[3]) if len(sys.argv) > 3 else 5.0
+    data = make_frame(FRAME_SHAPE, spots, background)
+
+    legacy_time, (legacy_min, legacy_max) = timed(legacy_percentiles, data)
+    sampled_time, (sampled_min, sampled_max) = timed(sampled_percentiles, data, stride)
+    images.ContrastCache.set('benchmark', (data.mean(), sampled_min, sampled_max))
+    cached_time, _ = timed(cached_percentiles, 'benchmark')
+
+    print(f'Frame {FRAME_SHAPE[0]}x{FRAME_SHAPE[1]}, {spots} spots, background {background}, stride {stride}')
+    print(f'{"Method":>10} {"Minimum":>10} {"Maximum":>10} {"Time (ms)":>10}')
+    print(f'{"full":>10} {legacy_min:10.1f} {legacy_max:10.1f} {legacy_time * 1e3:10.2f}')
+    print(f'{"sampled":>10} {sampled_min:10.1f} {sampled_max:10.1f} {sampled_time * 1e3:10.2f}')
+    print(f'{"cached":>10} {"":>10} {"":>10} {cached_time * 1e3:10.4f}')
+    min_error = abs(sampled_min - legacy_min) / max(abs(legacy_min), 1)
+    max_error = abs(sampled_max - legacy_max) / max(abs(legacy_max), 1)
+    print(f'Relative error: minimum {min_error:.2%}, maximum {max_error:.2%}')
@@ -0,0 +1,106 @@
+"""
+Benchmark of RecordArray appends.
+
+Appends scan points one at a time, as the plotter does, to a growing RecordArray and to a ring-buffer
+RecordArray, and in blocks with extend, querying an interpolated value every 100 points. The previous
+implementation, which rebuilt all interpolators on every append and shifted the whole buffer in ring-buffer
+mode, is measured on a smaller number of points because it is quadratic.
+
+Usage: python tests/bench_record_array.py [points]
+"""
+
+import os
+import sys
+import time
+
+import numpy
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mxdc.utils import misc
+
+DATA_TYPE = {'names': ['energy', 'i0', 'i1', 'i2'], 'formats': [float] * 4}
+LEGACY_POINTS = 5000
+RING_SIZE = 2500
+QUERY_INTERVAL = 100
+BLOCK_SIZE = 100
+
+
+class LegacyRecordArray(misc.RecordArray):
+    """
+    RecordArray with the previous eager interpolators and buffer shifting
+    """
+
+    def __init__(self, dtype, size=10, loop=False):
+        super().__init__(dtype, size=size, loop=loop)
+        self._data = numpy.empty(self.size, dtype=self.dtype)
+
+    def __call__(self, name, x):
+        if name in self.funcs:
+            return self.funcs[name](x)
+        return 0
+
+    def update_funcs(self):
+        if self.length > 1:
+            names = self.dtype.names
+            data = self.data
+            for name in names[1:]:
+                self.add_func(name, data[names[0]], data[name])
+
+    def append(self, rec):
+        with self.lock:
+            if self.length == self.size:
+                if self.loop:
+                    self._data[:-1] = self._data[1:]
+                    self.tail = self.size - 1
+                else:
+                    self.reserve(1)
+            self._data[self.tail] = tuple(rec)
+            self.tail += 1
+            self.update_funcs()
+
+
+def make_rows(points):
+    rows = numpy.empty(points, dtype=DATA_TYPE)
+    rows['energy'] = numpy.linspace(12.0, 13.0, points)
+    for name in DATA_TYPE['names'][1:]:
+        rows[name] = numpy.random.uniform(0, 1e5, points)
+    return rows
+
+
+def append_points(array, rows):
+    start = time.perf_counter()
+    for i, row in enumerate(rows):
+        array.append(row)
+        if i % QUERY_INTERVAL == 0:
+            array('i1', row['energy'])
+    return time.perf_counter() - start
+
+
+def extend_points(array, rows):
+    start = time.perf_counter()
+    for i in range(0, len(rows), BLOCK_SIZE):
+        block = rows[i:i + BLOCK_SIZE]
+        array.extend(block)
+        array('i1', block['energy'][-1])
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    points = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rows = make_rows(points)
+    legacy_rows = rows[:min(points, LEGACY_POINTS)]
+
+    results = [
+        ('append', len(rows), append_points(misc.RecordArray(DATA_TYPE), rows)),
+        ('append ring', len(rows), append_points(misc.RecordArray(DATA_TYPE, size=RING_SIZE, loop=True), rows)),
+        ('extend', len(rows), extend_points(misc.RecordArray(DATA_TYPE), rows)),
+        ('extend ring', len(rows), extend_points(misc.RecordArray(DATA_TYPE, size=RING_SIZE, loop=True), rows)),
+        ('legacy append', len(legacy_rows), append_points(LegacyRecordArray(DATA_TYPE), legacy_rows)),
+        ('legacy ring', len(legacy_rows), append_points(
+            LegacyRecordArray(DATA_TYPE, size=RING_SIZE, loop=True), legacy_rows
+        )),
+    ]
+    print(f'{"Mode":>14} {"Points":>8} {"Time (s)":>10} {"us/point":>10}')
+    for name, count, elapsed in results:
+        print(f'{name:>14} {count:8d} {elapsed:10.3f} {elapsed * 1e6 / count:10.2f}')
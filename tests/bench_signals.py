@@ -0,0 +1,74 @@
+"""
+Stress benchmark for cross-thread signal emission.
+
+A worker thread emits a signal as fast as possible for a fixed duration while the main loop
+dispatches the handlers. The same test is performed for a regular signal and a coalesced signal, reporting
+the emission rate, number of handler calls and the latency between emission in the worker thread and
+handling in the main loop.
+
+Usage: python tests/bench_signals.py [duration]
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gi.repository import GLib
+from mxdc import Object, Signal
+
+
+class Source(Object):
+    class Signals:
+        regular = Signal('regular', arg_types=(float,))
+        latest = Signal('latest', arg_types=(float,), coalesce=True)
+
+
+def run(signal, duration=2.0):
+    source = Source()
+    loop = GLib.MainLoop()
+    latencies = []
+    stats = {'emitted': 0}
+
+    def on_signal(obj, stamp):
+        latencies.append(time.perf_counter() - stamp)
+
+    def worker():
+        end_time = time.perf_counter() + duration
+        while time.perf_counter() < end_time:
+            source.emit(signal, time.perf_counter())
+            stats['emitted'] += 1
+
+        def wait_idle():
+            # let the main loop drain all pending emissions before quitting
+            GLib.idle_add(loop.quit, priority=GLib.PRIORITY_LOW)
+        GLib.idle_add(wait_idle, priority=GLib.PRIORITY_LOW)
+
+    source.connect(signal, on_signal)
+    threading.Thread(target=worker, daemon=True).start()
+    start = time.perf_counter()
+    loop.run()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    count = len(latencies)
+    return {
+        'rate': stats['emitted'] / duration,
+        'handled': count,
+        'drain': elapsed - duration,
+        'median': latencies[count // 2] * 1000 if count else 0.0,
+        'max': latencies[-1] * 1000 if count else 0.0,
+    }
+
+
+if __name__ == '__main__':
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+    print(f'{"Signal":>10} {"Emits/s":>12} {"Handled":>10} {"Drain (s)":>10} {"Median (ms)":>12} {"Max (ms)":>10}')
+    for name in ('regular', 'latest'):
+        result = run(name, duration)
+        print(
+            f'{name:>10} {result["rate"]:12.0f} {result["handled"]:10d} {result["drain"]:10.3f} '
+            f'{result["median"]:12.3f} {result["max"]:10.3f}'
+        )
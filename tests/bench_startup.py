@@ -0,0 +1,40 @@
+"""
+Startup micro-benchmark for device construction.
+
+Builds a large number of simulated motors and compares the time spent with the per-class signal
+table against introspecting the GObject type hierarchy for every instance as was done previously.
+
+Usage: python tests/bench_startup.py [count]
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mxdc import _get_signal_properties
+from mxdc.devices.motor import SimMotor
+
+
+def build(count):
+    start = time.perf_counter()
+    motors = [SimMotor(f'motor{i}', pos=0.0) for i in range(count)]
+    return time.perf_counter() - start, motors
+
+
+def introspect(motors):
+    start = time.perf_counter()
+    for motor in motors:
+        {name: None for name in _get_signal_properties(motor).keys()}
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    elapsed, motors = build(count)
+    overhead = introspect(motors)
+    print(f'Built {count} SimMotors in {elapsed:0.3f} s ({elapsed / count * 1e6:0.1f} us per motor)')
+    print(
+        f'Per-instance introspection would add {overhead:0.3f} s ({overhead / count * 1e6:0.1f} us per motor)'
+    )
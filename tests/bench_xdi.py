@@ -0,0 +1,97 @@
+"""
+Benchmark of XDI writing and reading.
+
+Writes a multi-MB slew-scan sized dataset with XDIData.save and with the previous row-by-row formatting,
+checks that both files are byte-identical, then compares reading the file with read_xdi against the previous
+whole-file regular expression and genfromtxt parser, and with the cache of parsed files. Plain and gzipped
+files are tested.
+
+Usage: python tests/bench_xdi.py [rows]
+"""
+
+import gzip
+import os
+import sys
+import tempfile
+import time
+from io import StringIO
+
+import numpy
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mxdc.utils import xdi
+
+
+def make_data(rows):
+    names = ['energy', 'normfluor', 'i0', 'ifluor1', 'ifluor2', 'ifluor3', 'ifluor4', 'exposure']
+    data = numpy.empty(rows, dtype={'names': names, 'formats': ['f4'] * len(names)})
+    data['energy'] = numpy.linspace(12.0, 13.0, rows)
+    for name in names[1:]:
+        data[name] = numpy.random.uniform(0, 1e5, rows)
+    return data
+
+
+def make_xdi(data):
+    xdi_data = xdi.XDIData(data=data, comments='Benchmark data', version='MxDC')
+    xdi_data['Facility.name'] = 'CLS'
+    xdi_data['Beamline.name'] = 'SIM-1'
+    xdi_data['Mono.name'] = 'Si 111'
+    xdi_data['Element.symbol'] = 'Se'
+    xdi_data['Element.edge'] = 'K'
+    xdi_data['Mono.d_spacing'] = 3.1356
+    for i, name in enumerate(data.dtype.names):
+        xdi_data['Column.{}'.format(i + 1)] = (name, None)
+    return xdi_data
+
+
+def legacy_save(xdi_data, filename):
+    data_format = ''.join(['  {}'] * len(xdi_data.data.dtype.names))
+    data_lines = [data_format.format(*row) for row in xdi_data.data]
+    saver = gzip.open if filename.endswith('.gz') else open
+    with saver(filename, 'wb') as handle:
+        output = xdi_data.format_header() + '\n'.join(data_lines)
+        handle.write(output.encode('utf8'))
+
+
+def legacy_read(filename):
+    opener = gzip.open if filename.endswith('.gz') else open
+    with opener(filename, 'rb') as handle:
+        raw = xdi.XDI_PATTERN.match(handle.read().decode('utf8')).groupdict()
+    return numpy.genfromtxt(
+        StringIO(raw['data_text']), dtype=None, names=raw['columns_text'].split(), deletechars=''
+    )
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+if __name__ == '__main__':
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    xdi_data = make_xdi(make_data(rows))
+    with tempfile.TemporaryDirectory() as directory:
+        xdi.XDICache.directory = os.path.join(directory, 'cache')
+        for extension in ('.xdi', '.xdi.gz'):
+            new_file = os.path.join(directory, 'new' + extension)
+            old_file = os.path.join(directory, 'old' + extension)
+            new_write, _ = timed(xdi_data.save, new_file)
+            old_write, _ = timed(legacy_save, xdi_data, old_file)
+            opener = gzip.open if extension.endswith('.gz') else open
+            with opener(new_file, 'rb') as new, opener(old_file, 'rb') as old:
+                identical = new.read() == old.read()
+
+            new_read, new_data = timed(xdi.read_xdi, new_file, False)
+            old_read, old_data = timed(legacy_read, old_file)
+            timed(xdi.read_xdi, new_file)
+            cached_read, _ = timed(xdi.read_xdi, new_file)
+            equal = all(
+                numpy.allclose(new_data.data[name], old_data[name]) for name in xdi_data.data.dtype.names
+            )
+            size = os.path.getsize(new_file) / 2 ** 20
+            print(f'{extension:>7}: {rows} rows, {size:0.1f} MB, byte-identical={identical}, same values={equal}')
+            print(f'{"":>9}write {old_write:0.3f} s -> {new_write:0.3f} s ({old_write / new_write:0.1f}x)')
+            print(f'{"":>9}read  {old_read:0.3f} s -> {new_read:0.3f} s ({old_read / new_read:0.1f}x)')
+            print(f'{"":>9}cached read {cached_read * 1e3:0.2f} ms')
@@ -0,0 +1,52 @@
+import os
+import sys
+import time
+
+import numpy
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('MXDC_CA_BACKEND', 'sim')
+
+from mxdc.devices import counter as counter_module
+from mxdc.devices.motor import SimMotor
+from mxdc.engines.scanning import FlyRecorder
+
+
+@pytest.fixture
+def counter(request):
+    return counter_module.Counter(f'SIMCA:TEST:{request.node.name}')
+
+
+def test_skewed_timestamps(counter):
+    start = time.time()
+    counter.on_monitor(10.0, start - 3600.0)    # IOC clock an hour behind
+    time.sleep(0.1)
+    counter.on_monitor(20.0, 0.0)               # soft record without a timestamp
+    time.sleep(0.1)
+    end = time.time()
+    average = counter.integrate(start, end) / (end - start)
+    assert 12.0 < average < 18.0, f'Values lost or double counted with skewed timestamps: {average=}'
+
+
+def test_future_timestamps(counter):
+    start = time.time()
+    counter.on_monitor(5.0, start + 3600.0)     # IOC clock an hour ahead
+    time.sleep(0.1)
+    end = time.time()
+    average = counter.integrate(start, end) / (end - start)
+    assert average == pytest.approx(5.0, rel=0.2), f'Value outside of the window with future timestamps: {average=}'
+
+
+def test_fly_recorder_time_base(counter):
+    motor = SimMotor('Fly Test', 0.0)
+    recorder = FlyRecorder(motor, [counter])
+    recorder.start()
+    for i in range(5):
+        motor.emit('changed', float(i))
+        counter.on_monitor(10.0 * i, 0.0)       # counter timestamps from a skewed IOC clock are ignored
+        time.sleep(0.02)
+    recorder.stop()
+    values = recorder.get_values(numpy.linspace(-0.5, 4.5, 6))
+    expected = [0.0, 10.0, 20.0, 30.0, 40.0]
+    assert values[:, 0].tolist() == pytest.approx(expected), f'Counter values not placed at motor positions {values!r}'
@@ -0,0 +1,55 @@
+import os
+import sys
+
+import pytest
+from gi.repository import GLib
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mxdc import Device
+
+
+def flush_events():
+    context = GLib.MainContext.default()
+    while context.iteration(False):
+        pass
+
+
+@pytest.fixture
+def devices():
+    parent, child = Device(), Device()
+    parent.add_components(child)
+    child.set_state(health=(0, '', ''))
+    flush_events()
+    return parent, child
+
+
+def test_minor_child_health(devices):
+    parent, child = devices
+    child.set_state(health=(1, 'minor', 'Minor issue'))
+    flush_events()
+    severity, context, message = parent.get_state('health')
+    assert severity == 0, f'Minor child health propagated to parent: {severity=}, {message=}'
+    assert parent.is_healthy(), 'Parent unhealthy because of a minor child issue'
+
+
+def test_serious_child_health(devices):
+    parent, child = devices
+    child.set_state(health=(4, 'serious', 'Serious issue'))
+    flush_events()
+    severity, context, message = parent.get_state('health')
+    assert severity == 4, f'Serious child health not propagated to parent: {severity=}'
+
+    child.set_state(health=(0, 'serious', ''))
+    flush_events()
+    severity, context, message = parent.get_state('health')
+    assert severity == 0, f'Parent health not cleared with the child: {severity=}'
+
+
+def test_minor_bits_masked(devices):
+    parent, child = devices
+    child.set_state(health=(1, 'minor', 'Minor issue'))
+    child.set_state(health=(2, 'marginal', 'Marginal issue'))
+    flush_events()
+    severity, context, message = parent.get_state('health')
+    assert severity == 2, f'Minor severity bit propagated with a marginal one: {severity=}'
@@ -49,3 +49,16 @@ def test_status_values(setup_devices):
     dev_a, dev_b = setup_devices
     for sig, value in TEST_STATES.items():
         assert dev_b.get_state(sig) == value, f'Signal "{sig}" value {repr(value)} failed: {repr(dev_b.get_states())}'
+
+
+class DevC(DevB):
+    class Signals:
+        sig_fast = Signal('sig-fast', arg_types=(float,), coalesce=True)
+
+
+def test_coalesced_inheritance():
+    assert DevA.__coalesced__ == frozenset(), f'Unexpected coalesced signals {DevA.__coalesced__!r}'
+    assert DevC.__coalesced__ == {'sig-fast'}, f'Coalesced signal not registered {DevC.__coalesced__!r}'
+    dev_c = DevC()
+    dev_c.set_state(sig_fast=1.5)
+    assert dev_c.get_state('sig_fast') == 1.5, 'Coalesced signal state not updated immediately'
@@ -0,0 +1,96 @@
+import os
+import sys
+import time
+
+import numpy
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('MXDC_CA_BACKEND', 'sim')
+
+from mxdc.com import ca, simca
+
+
+def wait_for(condition, timeout=5.0):
+    end = time.time() + timeout
+    while time.time() < end:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.fixture
+def motor(request):
+    sim = simca.aps_motor(f'SIMCA:TEST:{request.node.name}', position=0.0, velocity=5.0)
+    yield sim
+    sim.stop.put(1)
+    wait_for(lambda: sim.moving.value == sim.idle_value)
+
+
+def test_get_put():
+    simca.PVTable.define('SIMCA:TEST:value', 5)
+    pv = simca.PV('SIMCA:TEST:value')
+    assert pv.is_active(), 'Process variable not connected'
+    assert pv.get() == 5, f'Unexpected initial value {pv.get()!r}'
+    pv.put(7, wait=True)
+    assert simca.PVTable.value('SIMCA:TEST:value') == 7, 'Record not updated by put'
+    assert pv.get() == 7, f'Monitored value not updated {pv.get()!r}'
+
+
+def test_unmonitored_get():
+    pv = simca.PV('SIMCA:TEST:unmonitored', monitor=False)
+    simca.PVTable.get('SIMCA:TEST:unmonitored').set(3.5)
+    assert pv.get() == 3.5, f'Unmonitored value not read from record {pv.get()!r}'
+
+
+def test_get_put_many():
+    pvs = [simca.PV(f'SIMCA:TEST:many{i}') for i in range(3)]
+    simca.put_many(pvs, [1, 2, 3], wait=True)
+    values = simca.get_many(pvs)
+    assert values == [1, 2, 3], f'Unexpected values {values!r}'
+
+
+def test_deadband_numpy_scalars():
+    pv = simca.PV('SIMCA:TEST:deadband')
+    change_filter = ca.ChangeFilter(pv, deadband=0.5)
+    change_filter.last_value = numpy.float32(1.0)
+    assert change_filter.within_deadband(numpy.float64(1.25)), 'Numpy scalar within deadband not suppressed'
+    assert not change_filter.within_deadband(numpy.int32(2)), 'Numpy scalar outside deadband suppressed'
+    assert not change_filter.within_deadband('1.25'), 'Non-numeric value suppressed'
+
+
+def test_monitor():
+    record = simca.PVTable.define('SIMCA:TEST:monitor', 0)
+    pv = simca.PV('SIMCA:TEST:monitor')
+    updates = []
+    simca.add_monitor(pv, lambda value, timestamp: updates.append((value, timestamp)))
+    record.set(10)
+    record.set(11)
+    assert [value for value, timestamp in updates] == [10, 11], f'Unexpected monitor values {updates!r}'
+    assert updates[-1][1] == record.timestamp, 'Monitor timestamp does not match the record'
+
+
+def test_motor_move(motor):
+    motor.target.put(0.5)
+    assert wait_for(lambda: motor.readback.value == 0.5), f'Motor did not reach target {motor.readback.value!r}'
+    assert wait_for(lambda: motor.moving.value == motor.idle_value), 'Motor still moving after reaching target'
+
+
+def test_motor_retarget(motor):
+    motor.target.put(10.0)
+    first = motor.worker
+    time.sleep(0.1)
+    motor.target.put(-0.5)
+    assert not first.is_alive(), 'Previous ramp still running after a new target'
+    assert wait_for(lambda: motor.readback.value == -0.5), f'Motor did not reach new target {motor.readback.value!r}'
+    assert wait_for(lambda: motor.moving.value == motor.idle_value), 'Motor still moving after reaching target'
+
+
+def test_motor_stop(motor):
+    motor.target.put(10.0)
+    time.sleep(0.1)
+    motor.stop.put(1)
+    assert wait_for(lambda: not motor.worker.is_alive()), 'Ramp still running after stop'
+    assert motor.readback.value < 10.0, 'Motor was not stopped before the target'
+    assert motor.moving.value == motor.idle_value, 'Motor still moving after stop'
@@ -0,0 +1,35 @@
+import gc
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mxdc import Device
+from mxdc.utils.timeline import StartupTimeline
+
+
+def test_not_recording_by_default():
+    StartupTimeline.finish()
+    StartupTimeline.clear()
+    Device()
+    assert len(StartupTimeline.devices) == 0, 'Devices recorded without an explicit start'
+
+
+def test_devices_not_kept_alive():
+    StartupTimeline.start()
+    device = Device()
+    assert device in StartupTimeline.devices, 'Device created after start was not recorded'
+    del device
+    gc.collect()
+    StartupTimeline.finish()
+    assert len(StartupTimeline.devices) == 0, 'Timeline keeps released devices alive'
+
+
+def test_same_name_components():
+    StartupTimeline.start()
+    parent, first, second = Device(), Device(), Device()
+    StartupTimeline.connected(parent, first)
+    StartupTimeline.connected(parent, second)
+    StartupTimeline.finish()
+    assert len(StartupTimeline.devices[parent]['connected']) == 2, 'Components with the same name collide'
+    StartupTimeline.clear()
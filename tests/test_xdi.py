@@ -0,0 +1,69 @@
+import os
+import sys
+import time
+
+import numpy
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mxdc.utils import xdi
+
+
+def make_xdi(rows=100):
+    data = numpy.empty(rows, dtype={'names': ['energy', 'i0'], 'formats': ['f4', 'f4']})
+    data['energy'] = numpy.linspace(12.0, 13.0, rows)
+    data['i0'] = numpy.random.uniform(0, 1e5, rows)
+    xdi_data = xdi.XDIData(data=data, comments='Test data', version='MxDC')
+    xdi_data['Element.symbol'] = 'Se'
+    xdi_data['Element.edge'] = 'K'
+    xdi_data['Mono.d_spacing'] = 3.1356
+    xdi_data['Column.1'] = ('energy', None)
+    xdi_data['Column.2'] = ('i0', None)
+    return xdi_data
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(xdi.XDICache, 'directory', str(tmp_path / 'cache'))
+    return xdi.XDICache
+
+
+def cached_files(cache):
+    return sorted(os.listdir(cache.directory)) if os.path.exists(cache.directory) else []
+
+
+def test_partial_not_cached(cache, tmp_path):
+    filename = str(tmp_path / 'scan-partial.xdi')
+    make_xdi().save(filename)
+    xdi.read_xdi(filename)
+    assert cached_files(cache) == [], 'Partial data file was cached'
+
+
+def test_cache_size_limit(cache, tmp_path, monkeypatch):
+    filenames = [str(tmp_path / f'scan{i}.xdi') for i in range(4)]
+    for filename in filenames:
+        make_xdi(1000).save(filename)
+        xdi.read_xdi(filename)
+    entry_size = sum(os.path.getsize(os.path.join(cache.directory, name)) for name in cached_files(cache)) // 4
+
+    monkeypatch.setattr(cache, 'max_size', entry_size * 2)
+    old = time.time() - 3600
+    for i, filename in enumerate(filenames[:3]):
+        os.utime(cache.get_paths(filename)[1], (old + i, old + i))
+    cache.prune()
+    assert len(cached_files(cache)) == 4, 'Cache not reduced to the size limit'
+    assert cache.load(filenames[0]) is None, 'Least recently used entry was kept'
+    assert cache.load(filenames[3]) is not None, 'Most recently used entry was removed'
+
+
+def test_cache_age_limit(cache, tmp_path, monkeypatch):
+    filename = str(tmp_path / 'scan.xdi')
+    make_xdi().save(filename)
+    xdi.read_xdi(filename)
+    assert cache.load(filename) is not None, 'File not cached'
+
+    old = time.time() - cache.max_age - 60
+    os.utime(cache.get_paths(filename)[1], (old, old))
+    cache.prune()
+    assert cached_files(cache) == [], 'Expired cache entry was kept'